@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Crawl benchmark against a local synthetic website.
+# Run from the repository root: python3 benchmarks/crawl.py [-h]
+#
+# The website is served in-process, and each mode is crawled in a separate process, as Twisted's reactor cannot be restarted.
+# Results are printed as a JSON array, one object per mode, for regression comparison.
+
+import argparse, contextlib, http.server, json, os, random, resource, shlex, statistics, subprocess, sys, tempfile, threading, time
+
+MODES = {
+	"http"      : [],
+	"playwright": ["-p"],
+	"hybrid"    : ["-ph"]
+}
+
+class Site:
+
+	def __init__(self, pages: int, fanout: int, density: int, scripts: int, bundles: int, bundle_size: int, latency: float):
+		"""
+		Class for generating a synthetic website.\n
+		Page 'i' links to its 'fanout' children in a tree, to 'density' random pages, and to 'scripts' out of 'bundles' JavaScript bundles of 'bundle_size' KB.
+		"""
+		self.pages       = pages
+		self.fanout      = fanout
+		self.density     = density
+		self.scripts     = scripts
+		self.bundles     = bundles
+		self.bundle_size = bundle_size
+		self.latency     = latency
+
+	def page(self, index: int):
+		"""
+		Get a page.
+		"""
+		generator = random.Random(index)
+		children  = [index * self.fanout + i for i in range(1, self.fanout + 1)]
+		links     = [i for i in children if i < self.pages] + [generator.randrange(self.pages) for _ in range(self.density)]
+		scripts   = [generator.randrange(self.bundles) for _ in range(self.scripts)] if self.bundles else []
+		html      = [f"<html><head><title>Page {index}</title>"]
+		html.extend(f"<script src=\"/static/{i}.js\"></script>" for i in scripts)
+		html.append("</head><body>")
+		html.extend(f"<p><a href=\"/page/{i}.html\">Page {i}</a> Lorem ipsum dolor sit amet.</p>" for i in links)
+		html.append("</body></html>")
+		return ("").join(html).encode("UTF-8")
+
+	def bundle(self, index: int):
+		"""
+		Get a JavaScript bundle.
+		"""
+		line = f"function f{index}(a,b){{var c=a+b;if(c>0){{return c*{index}}}else{{return fetch('/api/{index}')}}}}\n"
+		return (line * max(1, self.bundle_size * 1024 // len(line))).encode("UTF-8")
+
+	def handler(self):
+		"""
+		Get an HTTP request handler class for the website.
+		"""
+		site = self
+
+		class Handler(http.server.BaseHTTPRequestHandler):
+
+			def do_GET(self):
+				if site.latency > 0:
+					time.sleep(site.latency)
+				status, content_type, body = 404, "text/plain", b"Not Found"
+				name, _, extension = self.path.rsplit("/", 1)[-1].partition(".")
+				if self.path.startswith("/page/") and extension == "html" and name.isdigit() and int(name) < site.pages:
+					status, content_type, body = 200, "text/html; charset=utf-8", site.page(int(name))
+				elif self.path.startswith("/static/") and extension == "js" and name.isdigit() and int(name) < site.bundles:
+					status, content_type, body = 200, "application/javascript", site.bundle(int(name))
+				self.send_response(status)
+				self.send_header("Content-Type", content_type)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, format, *args):
+				pass
+
+		return Handler
+
+@contextlib.contextmanager
+def serve(site: Site):
+	"""
+	Serve a website on a random local port in a background thread.
+	"""
+	server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), site.handler())
+	server.daemon_threads = True
+	thread = threading.Thread(target = server.serve_forever, daemon = True)
+	thread.start()
+	try:
+		yield f"http://127.0.0.1:{server.server_address[1]}/page/0.html"
+	finally:
+		server.shutdown()
+		server.server_close()
+
+def percentile(values: list[float], percent: float):
+	"""
+	Get a percentile of a list of values.\n
+	Returns zero if the list is empty.
+	"""
+	if not values:
+		return 0
+	if len(values) == 1:
+		return values[0]
+	return statistics.quantiles(values, n = 100, method = "inclusive")[int(percent) - 1]
+
+# ----------------------------------------
+
+def worker(url: str, mode: str, extra: list[str], out: str):
+	"""
+	Crawl the website in the current process, and write the metrics to the output file.\n
+	The spider's success callback is wrapped to measure the time spent in each call, and its error callback to count the errors.
+	"""
+	from scrapy_scraper import main
+	from scrapy_scraper.utils import scrape
+	latencies = []
+	errors    = []
+	callback  = scrape.ScrapyScraperSpider._ScrapyScraperSpider__success
+	errback   = scrape.ScrapyScraperSpider._ScrapyScraperSpider__error
+
+	async def timed(self, response):
+		elapsed  = 0
+		iterator = callback(self, response).__aiter__()
+		while True:
+			start = time.perf_counter()
+			try:
+				result = await iterator.__anext__()
+			except StopAsyncIteration:
+				elapsed += time.perf_counter() - start
+				break
+			elapsed += time.perf_counter() - start
+			yield result
+		latencies.append(elapsed)
+
+	async def counted(self, failure):
+		errors.append(failure)
+		await errback(self, failure)
+
+	scrape.ScrapyScraperSpider._ScrapyScraperSpider__success = timed
+	scrape.ScrapyScraperSpider._ScrapyScraperSpider__error   = counted
+	directory = tempfile.mkdtemp()
+	sys.argv  = ["scrapy-scraper", "-u", url, "-o", os.path.join(directory, "results.json"), "-w", "off", "-r", "0"] + MODES[mode] + extra
+	start     = time.perf_counter()
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		main.main()
+	elapsed = time.perf_counter() - start
+	usage   = resource.getrusage(resource.RUSAGE_SELF)
+	metrics = {
+		"mode"              : mode,
+		"pages"             : len(latencies),
+		"errors"            : len(errors),
+		"seconds"           : round(elapsed, 3),
+		"pages_per_second"  : round(len(latencies) / elapsed, 2) if elapsed > 0 else 0,
+		"callback_p50_ms"   : round(percentile(latencies, 50) * 1000, 3),
+		"callback_p99_ms"   : round(percentile(latencies, 99) * 1000, 3),
+		"peak_rss_mb"       : round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2), # bytes on macOS, kilobytes elsewhere
+		"cpu_user_seconds"  : round(usage.ru_utime, 3),
+		"cpu_system_seconds": round(usage.ru_stime, 3)
+	}
+	open(out, "w").write(json.dumps(metrics))
+
+def run(url: str, mode: str, extra: list[str]):
+	"""
+	Crawl the website in a separate process.\n
+	Returns the metrics, or an error message on failure.
+	"""
+	with tempfile.NamedTemporaryFile(suffix = ".json", delete = False) as tmp:
+		out = tmp.name
+	try:
+		process = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", url, mode, out, shlex.join(extra)], capture_output = True, text = True)
+		if process.returncode != 0 or not os.path.getsize(out):
+			lines = (process.stderr or process.stdout).strip().splitlines()
+			return {"mode": mode, "error": lines[-1] if lines else f"exit code {process.returncode}"}
+		return json.loads(open(out).read())
+	finally:
+		os.remove(out)
+
+def main():
+	if len(sys.argv) == 6 and sys.argv[1] == "--worker":
+		worker(sys.argv[2], sys.argv[3], shlex.split(sys.argv[5]), sys.argv[4])
+		return
+	parser = argparse.ArgumentParser(description = "Crawl benchmark against a local synthetic website.")
+	parser.add_argument("--pages"      , type = int  , default = 500             , help = "number of pages")
+	parser.add_argument("--fanout"     , type = int  , default = 5               , help = "number of child pages per page")
+	parser.add_argument("--density"    , type = int  , default = 10              , help = "number of extra random links per page")
+	parser.add_argument("--scripts"    , type = int  , default = 3               , help = "number of script tags per page")
+	parser.add_argument("--bundles"    , type = int  , default = 20              , help = "number of distinct JavaScript bundles")
+	parser.add_argument("--bundle-size", type = int  , default = 64              , help = "JavaScript bundle size in KB")
+	parser.add_argument("--latency"    , type = float, default = 0               , help = "injected latency per request in seconds")
+	parser.add_argument("--modes"      , type = str  , default = "http,playwright", help = f"comma-separated modes: {', '.join(MODES)}")
+	parser.add_argument("--args"       , type = str  , default = ""              , help = "extra Scrapy Scraper options, e.g. \"-cr 50 -d downloads\"")
+	parser.add_argument("--out"        , type = str  , default = ""              , help = "also write the results to a file")
+	args  = parser.parse_args()
+	modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+	for mode in modes:
+		if mode not in MODES:
+			parser.error(f"unknown mode: {mode}")
+	site    = Site(args.pages, args.fanout, args.density, args.scripts, args.bundles, args.bundle_size, args.latency)
+	results = []
+	with serve(site) as url:
+		for mode in modes:
+			results.append(run(url, mode, shlex.split(args.args)))
+	text = json.dumps(results, indent = 4)
+	print(text)
+	if args.out:
+		open(args.out, "w").write(text)
+
+if __name__ == "__main__":
+	main()
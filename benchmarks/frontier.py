@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Shared frontier benchmark and correctness check, for the SQLite and Redis backends.
+# Run from the repository root: python3 benchmarks/frontier.py [-h]
+#
+# The Redis backend is checked against a minimal in-process stand-in speaking the Redis protocol, so no server is needed.
+# Several instances push overlapping URLs, and pop them concurrently, as crawler instances sharing a frontier would.
+# Exits with a non-zero code if a URL is queued twice, popped by more than one instance, or lost.
+
+from scrapy_scraper.utils import frontier
+
+import argparse, collections, os, socketserver, tempfile, threading, time
+
+class RESPHandler(socketserver.StreamRequestHandler):
+	"""
+	Class for handling a connection to the stand-in, i.e. 'AUTH', 'SELECT', 'SADD', 'RPUSH', and 'LPOP' with a count.
+	"""
+
+	disable_nagle_algorithm = True # pipelined replies are written one by one
+
+	def __read_command(self) -> list[str]:
+		"""
+		Read a command, i.e. an array of bulk strings.
+		"""
+		line = self.rfile.readline()
+		if not line:
+			return []
+		command = []
+		for _ in range(int(line[1:-2])):
+			length = int(self.rfile.readline()[1:-2])
+			command.append(self.rfile.read(length + 2)[:-2].decode("UTF-8"))
+		return command
+
+	def __reply(self, command: list[str]) -> bytes:
+		"""
+		Execute a command, and get its reply.
+		"""
+		name = command[0].upper()
+		with self.server.lock:
+			if name in ["AUTH", "SELECT"]:
+				return b"+OK\r\n"
+			elif name == "SADD":
+				added = len(set(command[2:]) - self.server.sets[command[1]])
+				self.server.sets[command[1]].update(command[2:])
+				return f":{added}\r\n".encode("UTF-8")
+			elif name == "RPUSH":
+				self.server.lists[command[1]].extend(command[2:])
+				return f":{len(self.server.lists[command[1]])}\r\n".encode("UTF-8")
+			elif name == "LPOP":
+				values = [self.server.lists[command[1]].popleft() for _ in range(min(int(command[2]), len(self.server.lists[command[1]])))]
+				if not values:
+					return b"*-1\r\n"
+				return f"*{len(values)}\r\n".encode("UTF-8") + b"".join(f"${len(value.encode('UTF-8'))}\r\n{value}\r\n".encode("UTF-8") for value in values)
+		return f"-ERR unknown command '{name}'\r\n".encode("UTF-8")
+
+	def handle(self):
+		while True:
+			command = self.__read_command()
+			if not command:
+				break
+			self.wfile.write(self.__reply(command))
+
+class RESPServer(socketserver.ThreadingTCPServer):
+
+	daemon_threads      = True
+	allow_reuse_address = True
+
+	def __init__(self):
+		"""
+		Class for a minimal in-process stand-in for a Redis server, on a random local port.
+		"""
+		super().__init__(("127.0.0.1", 0), RESPHandler)
+		self.lock  = threading.Lock()
+		self.sets  = collections.defaultdict(set)
+		self.lists = collections.defaultdict(collections.deque)
+
+def run(url: str, instances: int, urls: int, batch: int):
+	"""
+	Push overlapping URLs from each instance, then pop them from all the instances concurrently.\n
+	Each instance has its own connection, opened in its own thread.\n
+	Returns the push and pop times in seconds, the number of newly queued URLs, and the URLs popped by each instance.
+	"""
+	links   = [(f"https://example.com/page/{i}", 1) for i in range(urls)]
+	queued  = [0] * instances
+	popped  = [[] for _ in range(instances)]
+	times   = []
+	barrier = threading.Barrier(instances, action = lambda: times.append(time.perf_counter()))
+	def instance(index: int):
+		connection = frontier.connect(url)
+		try:
+			barrier.wait()
+			offset = index * batch % urls # each instance starts at a different offset, and wraps around, so every URL is pushed by every instance
+			for start in range(0, urls, batch):
+				queued[index] += connection.push([links[(offset + i) % urls] for i in range(start, min(start + batch, urls))])
+			barrier.wait()
+			while True:
+				entries = connection.pop(batch)
+				if not entries:
+					break
+				popped[index].extend(entries)
+			barrier.wait()
+		finally:
+			connection.close()
+	threads = [threading.Thread(target = instance, args = (i,)) for i in range(instances)]
+	[thread.start() for thread in threads]
+	[thread.join() for thread in threads]
+	return times[1] - times[0], times[2] - times[1], sum(queued), popped
+
+def main():
+	parser = argparse.ArgumentParser(description = "Shared frontier benchmark and correctness check.")
+	parser.add_argument("--instances", type = int, default = 4    , help = "number of crawler instances sharing the frontier")
+	parser.add_argument("--urls"     , type = int, default = 20000, help = "number of unique URLs pushed by each instance")
+	parser.add_argument("--batch"    , type = int, default = 100  , help = "number of URLs per push and per pop")
+	args   = parser.parse_args()
+	server = RESPServer()
+	threading.Thread(target = server.serve_forever, daemon = True).start()
+	failed = False
+	print(f"{'backend':>8} {'push (s)':>10} {'pop (s)':>10} {'queued':>8} {'popped':>8} {'passed':>7}")
+	try:
+		with tempfile.TemporaryDirectory() as directory:
+			for backend, url in [("sqlite", f"sqlite:///{os.path.join(directory, 'frontier.db')}"), ("redis", f"redis://127.0.0.1:{server.server_address[1]}")]:
+				push_time, pop_time, queued, popped = run(url, args.instances, args.urls, args.batch)
+				flat   = [entry for entries in popped for entry in entries]
+				passed = queued == args.urls and len(flat) == args.urls and len(set(flat)) == args.urls
+				failed = failed or not passed
+				print(f"{backend:>8} {push_time:>10.3f} {pop_time:>10.3f} {queued:>8} {len(flat):>8} {str(passed):>7}")
+	finally:
+		server.shutdown()
+		server.server_close()
+	if failed:
+		raise SystemExit(1)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+# Micro-benchmark of the scope check, i.e. the linear whitelist scan versus the domain name index.
+# Run from the repository root: python3 benchmarks/scope.py
+
+from scrapy_scraper.utils import scope
+
+import random, string, timeit
+
+LINKS = 1000
+RUNS  = 3
+SIZES = [10, 1000, 10000]
+
+def random_domain():
+	"""
+	Get a random domain name.
+	"""
+	return ("").join(random.choices(string.ascii_lowercase, k = 12)) + random.choice([".com", ".net", ".org"])
+
+def linear(allowed_domains: list[str], domain: str):
+	"""
+	Scope check before the domain name index.
+	"""
+	domain = domain.lower()
+	return not allowed_domains or any(domain == allowed or domain.endswith(f".{allowed}") for allowed in allowed_domains)
+
+def main():
+	random.seed(0)
+	print(f"{'whitelist':>10} {'linear (s)':>12} {'index (s)':>12} {'speedup':>10}")
+	for size in SIZES:
+		whitelist = [random_domain() for _ in range(size)]
+		index     = scope.Scope(whitelist)
+		domains   = [f"www.{random.choice(whitelist)}" if random.random() < 0.5 else f"www.{random_domain()}" for _ in range(LINKS)]
+		assert all(linear(whitelist, domain) == index.is_in_scope(domain) for domain in domains[:100])
+		linear_time = min(timeit.repeat(lambda: [linear(whitelist, domain) for domain in domains], number = 1, repeat = RUNS))
+		index_time  = min(timeit.repeat(lambda: [index.is_in_scope(domain) for domain in domains], number = 1, repeat = RUNS))
+		print(f"{size:>10} {linear_time:>12.4f} {index_time:>12.4f} {linear_time / index_time:>9.1f}x")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Cold-start benchmark and regression check.
+# Run from the repository root: python3 benchmarks/startup.py [-h]
+#
+# Each scenario runs 'main()' in a fresh interpreter, so nothing is imported beforehand.
+# Exits with a non-zero code if a scenario exceeds the time budget, or imports a heavy dependency it does not need.
+
+import argparse, json, os, statistics, subprocess, sys, time
+
+SCENARIOS = {
+	"help"   : ["-h"],
+	"invalid": ["-u", "invalid", "-o", os.devnull]
+}
+
+HEAVY_MODULES = ["scrapy", "twisted", "playwright", "scrapy_playwright", "bs4", "jsbeautifier", "tldextract", "bot_safe_agents"]
+
+def worker(args: list[str], out: str):
+	"""
+	Run 'main()' in the current process, and write the loaded heavy dependencies to the output file.
+	"""
+	from scrapy_scraper import main
+	sys.argv = ["scrapy-scraper"] + args
+	with open(os.devnull, "w") as devnull:
+		stdout, sys.stdout = sys.stdout, devnull
+		try:
+			main.main()
+		except SystemExit:
+			pass
+		finally:
+			sys.stdout = stdout
+	open(out, "w").write(json.dumps([name for name in HEAVY_MODULES if name in sys.modules]))
+
+def run(scenario: str, out: str):
+	"""
+	Run a scenario in a fresh interpreter.\n
+	Returns the wall time in seconds, including the interpreter startup, and the loaded heavy dependencies.
+	"""
+	start = time.perf_counter()
+	subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", scenario, out], capture_output = True, check = True)
+	elapsed = time.perf_counter() - start
+	return elapsed, json.loads(open(out).read())
+
+def profile(module: str, top: int):
+	"""
+	Get the slowest imports of a module, by cumulative time, using Python's '-X importtime'.
+	"""
+	process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output = True, text = True)
+	imports = []
+	for line in process.stderr.splitlines():
+		parts = line.split("|")
+		if len(parts) == 3 and parts[1].strip().isdigit():
+			imports.append((int(parts[1]) / 1000, parts[2].strip()))
+	return sorted(imports, reverse = True)[:top]
+
+def main():
+	if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+		worker(SCENARIOS[sys.argv[2]], sys.argv[3])
+		return
+	parser = argparse.ArgumentParser(description = "Cold-start benchmark and regression check.")
+	parser.add_argument("--runs"   , type = int  , default = 5  , help = "number of runs per scenario")
+	parser.add_argument("--budget" , type = float, default = 0.3, help = "cold-start time budget in seconds, for the median run")
+	parser.add_argument("--profile", type = int  , default = 0  , help = "also print the N slowest imports of the entry point and of the crawler")
+	args    = parser.parse_args()
+	out     = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".startup.json")
+	results = []
+	failed  = False
+	try:
+		for scenario in SCENARIOS:
+			times  = []
+			loaded = []
+			for _ in range(args.runs):
+				elapsed, loaded = run(scenario, out)
+				times.append(elapsed)
+			median = statistics.median(times)
+			passed = median <= args.budget and not loaded
+			failed = failed or not passed
+			results.append({"scenario": scenario, "median_seconds": round(median, 3), "min_seconds": round(min(times), 3), "budget_seconds": args.budget, "heavy_modules": loaded, "passed": passed})
+	finally:
+		if os.path.isfile(out):
+			os.remove(out)
+	print(json.dumps(results, indent = 4))
+	if args.profile:
+		for module in ["scrapy_scraper.main", "scrapy_scraper.utils.scrape"]:
+			print(f"Slowest imports of '{module}' (cumulative ms):")
+			for milliseconds, name in profile(module, args.profile):
+				print(f"{milliseconds:>10.1f} {name}")
+	sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+	main()
@@ -1,31 +1,63 @@
 #!/usr/bin/env python3
 
-from .utils import config, scrape, validate
+from .utils import config, validate
 
 def main():
 	success, args = validate.Validate().validate_args()
 	if success:
 		config.banner()
+		from .utils import scrape # lazy, Scrapy is slow to import, and is not needed for the help or invalid arguments
 		scrapy_scraper = scrape.ScrapyScraper(
 			args.urls,
 			args.whitelist,
 			args.playwright,
+			args.playwright_hybrid,
 			args.playwright_wait,
+			args.playwright_contexts,
+			args.playwright_context_pages,
+			args.playwright_contexts_domain,
+			args.playwright_network,
+			args.playwright_readiness,
 			args.concurrent_requests,
 			args.concurrent_requests_domain,
+			args.shards,
 			args.sleep,
 			args.random_sleep,
 			args.auto_throttle,
+			args.adaptive_concurrency,
 			args.retries,
 			args.recursion,
+			args.scheduling_policy,
+			args.scoring,
+			args.canonicalize,
+			args.template_limit,
+			args.sitemaps,
+			args.max_html,
+			args.max_js,
+			args.extended_extraction,
 			args.request_timeout,
 			args.header,
 			args.cookie,
 			args.user_agent,
 			args.proxy,
 			args.downloads,
+			args.download_hash,
 			args.screenshots,
+			args.screenshot_viewport,
+			args.screenshot_format,
+			args.screenshot_quality,
+			args.screenshot_thumbnail,
+			args.screenshot_workers,
 			args.out,
+			args.stream_out,
+			args.no_compact,
+			args.bloom_filter,
+			args.job,
+			args.cache,
+			args.frontier,
+			args.metrics,
+			args.metrics_interval,
+			args.metrics_port,
 			args.debug
 		)
 		scrapy_scraper.run()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import dataclasses, json, os, sqlite3
+
+DATABASE = "cache.db"
+TIMEOUT  = 30
+
+@dataclasses.dataclass
+class Entry:
+	etag         : str       = ""
+	last_modified: str       = ""
+	status       : int       = 200
+	in_scope     : list[str] = dataclasses.field(default_factory = list)
+	out_of_scope : list[str] = dataclasses.field(default_factory = list)
+
+class Cache:
+
+	def __init__(self, directory: str, commit_size: int = 100):
+		"""
+		Class for caching the validators, i.e. ETag and Last-Modified, and the extracted links of each response, keyed by the request fingerprint.\n
+		Entries are stored in a SQLite database inside the directory, and are committed in batches.
+		"""
+		self.__commit_size = commit_size
+		self.__uncommitted = 0
+		self.__connection  = sqlite3.connect(os.path.join(directory, DATABASE), timeout = TIMEOUT)
+		self.__connection.execute("PRAGMA journal_mode = WAL")
+		self.__connection.execute("CREATE TABLE IF NOT EXISTS cache (fingerprint TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT NOT NULL, last_modified TEXT NOT NULL, status INTEGER NOT NULL, in_scope TEXT NOT NULL, out_of_scope TEXT NOT NULL) WITHOUT ROWID")
+		self.__connection.commit()
+
+	def get(self, fingerprint: str) -> Entry | None:
+		"""
+		Get a cached entry.\n
+		Returns 'None' if there is no entry.
+		"""
+		row = self.__connection.execute("SELECT etag, last_modified, status, in_scope, out_of_scope FROM cache WHERE fingerprint = ?", (fingerprint,)).fetchone()
+		return Entry(row[0], row[1], row[2], json.loads(row[3]), json.loads(row[4])) if row else None
+
+	def put(self, fingerprint: str, url: str, entry: Entry):
+		"""
+		Cache an entry, and commit the batch if it is full.
+		"""
+		self.__connection.execute(
+			"INSERT OR REPLACE INTO cache (fingerprint, url, etag, last_modified, status, in_scope, out_of_scope) VALUES (?, ?, ?, ?, ?, ?, ?)",
+			(fingerprint, url, entry.etag, entry.last_modified, entry.status, json.dumps(entry.in_scope), json.dumps(entry.out_of_scope))
+		)
+		self.__uncommitted += 1
+		if self.__uncommitted >= self.__commit_size:
+			self.commit()
+
+	def commit(self):
+		"""
+		Commit the cached entries.
+		"""
+		self.__connection.commit()
+		self.__uncommitted = 0
+
+	def close(self):
+		"""
+		Commit the cached entries and close the database.
+		"""
+		self.commit()
+		self.__connection.close()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+from scrapy             import Spider
+from scrapy.crawler     import Crawler
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.http        import Request
+
+import collections, hashlib, math, os, pickle
+
+INITIAL_CAPACITY = 65536
+GROWTH           = 2
+TIGHTENING       = 0.9
+JOB_FILTER       = "requests.bloom"
+RECENT_WINDOW    = 100000
+
+class BloomFilter:
+
+	def __init__(self, capacity: int, error_rate: float):
+		"""
+		Class for a fixed-size Bloom filter.\n
+		Bit positions are derived from two 64-bit hashes by double hashing.
+		"""
+		self.capacity = capacity
+		self.count    = 0
+		self.__size   = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+		self.__hashes = max(1, round(self.__size / capacity * math.log(2)))
+		self.__bits   = bytearray((self.__size + 7) // 8)
+
+	def __positions(self, first: int, second: int):
+		"""
+		Get the bit positions of a key.
+		"""
+		return [(first + i * second) % self.__size for i in range(self.__hashes)]
+
+	def contains(self, first: int, second: int):
+		"""
+		Check if a key might have been added.
+		"""
+		return all(self.__bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(first, second))
+
+	def add(self, first: int, second: int):
+		"""
+		Add a key.
+		"""
+		for position in self.__positions(first, second):
+			self.__bits[position >> 3] |= 1 << (position & 7)
+		self.count += 1
+
+	def get_bytes(self):
+		"""
+		Get the size of the bit array in bytes.
+		"""
+		return len(self.__bits)
+
+class ScalableBloomFilter:
+
+	def __init__(self, error_rate: float, capacity: int = INITIAL_CAPACITY):
+		"""
+		Class for a scalable Bloom filter, i.e. a series of Bloom filters with growing capacities and tightening error rates.\n
+		Memory grows with the number of keys, while the overall false-positive rate stays below the specified error rate.\n
+		A false positive means a new key is reported as already seen, so its URL is skipped.
+		"""
+		self.__error_rate = error_rate * (1 - TIGHTENING)
+		self.__filters    = [BloomFilter(capacity, self.__error_rate)]
+
+	def add(self, key: str | bytes):
+		"""
+		Add a key.\n
+		Returns 'True' if the key might have been added before, in which case it is not added again.
+		"""
+		if isinstance(key, str):
+			key = key.encode("UTF-8")
+		digest = hashlib.blake2b(key, digest_size = 16).digest()
+		first  = int.from_bytes(digest[:8], "little")
+		second = int.from_bytes(digest[8:], "little") | 1
+		for bloom in self.__filters:
+			if bloom.contains(first, second):
+				return True
+		last = self.__filters[-1]
+		if last.count >= last.capacity:
+			last = BloomFilter(last.capacity * GROWTH, self.__error_rate * TIGHTENING ** len(self.__filters))
+			self.__filters.append(last)
+		last.add(first, second)
+		return False
+
+	def get_count(self):
+		"""
+		Get the number of added keys.
+		"""
+		return sum(bloom.count for bloom in self.__filters)
+
+	def get_bytes(self):
+		"""
+		Get the size of all the bit arrays in bytes.
+		"""
+		return sum(bloom.get_bytes() for bloom in self.__filters)
+
+class RecentSet:
+
+	def __init__(self, window: int = RECENT_WINDOW):
+		"""
+		Class for an exact set of the most recently added keys, i.e. keys older than the window are forgotten.\n
+		Memory is bounded by the window, and a forgotten key is reported as new again, so a duplicate can slip through, but a new key is never skipped.
+		"""
+		self.__window = window
+		self.__keys   = collections.OrderedDict()
+
+	def add(self, key: str):
+		"""
+		Add a key.\n
+		Returns 'True' if the key is within the window, in which case it becomes the most recent key.
+		"""
+		if key in self.__keys:
+			self.__keys.move_to_end(key)
+			return True
+		self.__keys[key] = None
+		if len(self.__keys) > self.__window:
+			self.__keys.popitem(last = False)
+		return False
+
+class BloomDupeFilter(BaseDupeFilter):
+
+	def __init__(self, crawler: Crawler, error_rate: float, path: str):
+		"""
+		Class for filtering duplicate requests by their fingerprints with a scalable Bloom filter, instead of a set.\n
+		If a job directory is specified, the filter is persisted to it.
+		"""
+		self.__crawler = crawler
+		self.__path    = path
+		self.__filter  = None
+		if self.__path and os.path.isfile(self.__path):
+			with open(self.__path, "rb") as stream:
+				self.__filter = pickle.load(stream)
+		if not self.__filter:
+			self.__filter = ScalableBloomFilter(error_rate)
+
+	@classmethod
+	def from_crawler(cls, crawler: Crawler):
+		"""
+		Scrapy's dupe filter factory.
+		"""
+		job = crawler.settings.get("JOBDIR", "")
+		return cls(crawler, crawler.settings.getfloat("BLOOM_FILTER_ERROR_RATE", 0.001), os.path.join(job, JOB_FILTER) if job else "")
+
+	def request_seen(self, request: Request):
+		seen = self.__filter.add(self.__crawler.request_fingerprinter.fingerprint(request))
+		self.__crawler.stats.set_value("scrapy_scraper/requests_bloom_bytes", self.__filter.get_bytes())
+		return seen
+
+	def close(self, reason: str):
+		if self.__path:
+			with open(self.__path, "wb") as stream:
+				pickle.dump(self.__filter, stream)
+
+	def log(self, request: Request, spider: Spider):
+		self.__crawler.stats.inc_value("dupefilter/filtered")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import asyncio, concurrent.futures, multiprocessing, os, typing
+
+def beautify(content: str | bytes, filename: str):
+	"""
+	Beautify a JavaScript file and write it to the output file.\n
+	Meant to be run in a worker process.\n
+	Returns an empty string on success, or an error message on failure.
+	"""
+	from bs4 import BeautifulSoup # lazy, imported by the worker processes only
+	import jsbeautifier
+	message = ""
+	try:
+		soup = BeautifulSoup(content, "html.parser")
+		open(filename, "w").write(jsbeautifier.beautify(soup.get_text()))
+	except Exception as ex:
+		message = str(ex)
+	return message
+
+def spool(content: str | bytes, filename: str):
+	"""
+	Write a JavaScript file as is to a temporary file.\n
+	Meant to be run in a thread.
+	"""
+	open(filename, "wb").write(content.encode("UTF-8") if isinstance(content, str) else content)
+
+def beautify_file(spool: str, filename: str):
+	"""
+	Beautify a JavaScript file spooled to a temporary file, write it to the output file, and remove the temporary file.\n
+	Meant to be run in a worker process.\n
+	Returns an empty string on success, or an error message on failure.
+	"""
+	message = ""
+	try:
+		content = open(spool, "rb").read()
+		os.remove(spool)
+		message = beautify(content, filename)
+	except Exception as ex:
+		message = str(ex)
+	return message
+
+class Pool:
+
+	def __init__(self, workers: int, backlog: int):
+		"""
+		Class for offloading CPU-heavy tasks from the reactor thread to a process pool.\n
+		At most 'backlog' tasks can be pending at once, after which the submitter has to wait.
+		"""
+		self.__executor = concurrent.futures.ProcessPoolExecutor(workers, mp_context = multiprocessing.get_context("spawn"))
+		self.__backlog  = asyncio.Semaphore(backlog)
+
+	async def submit(self, callback: typing.Callable[[str], None], func: typing.Callable[..., str], *args: typing.Any):
+		"""
+		Submit a task to the pool, and call the callback with its result once the task is done.\n
+		If the task fails, the callback is called with the exception message instead.\n
+		Waits while the backlog is full.
+		"""
+		await self.__backlog.acquire()
+		future = asyncio.wrap_future(self.__executor.submit(func, *args))
+		future.add_done_callback(lambda future: self.__done(future, callback))
+
+	def __done(self, future: asyncio.Future, callback: typing.Callable[[str], None]):
+		"""
+		On task done callback.
+		"""
+		self.__backlog.release()
+		try:
+			result = future.result()
+		except Exception as ex:
+			result = str(ex)
+		callback(result)
+
+	def close(self):
+		"""
+		Wait for the pending tasks to finish, and shut down the pool.
+		"""
+		self.__executor.shutdown(wait = True)
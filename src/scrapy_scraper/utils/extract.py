@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import lxml.etree, re, typing, urllib.parse
+
+__LINK_ATTRIBUTES          = {"script": "src", "a": "href", "link": "href"}
+__EXTENDED_LINK_ATTRIBUTES = {**__LINK_ATTRIBUTES, "form": "action", "iframe": "src", "frame": "src"}
+__SRCSET_TAGS              = ["img", "source"]
+__COUNTED_TAGS             = ["noscript"]
+__SCRIPT_TYPES             = ["", "module", "text/javascript", "application/javascript", "application/x-javascript", "text/ecmascript", "application/ecmascript"]
+__SCHEME_WHITELIST         = ["http", "https"]
+__PARSERS                  = {}
+
+# quoted absolute URLs, e.g. 'https://example.com/api', protocol-relative URLs, e.g. '//example.com/api', root-relative paths, e.g. '/api/users?id=1', and dot-relative paths, e.g. './chunk.js'
+# bare relative paths, e.g. 'api/users', are not matched, as most are module names, e.g. 'react/jsx-runtime', that are not URLs at all
+# matches are bounded in length, so a malformed bundle cannot trigger a runaway match
+__ENDPOINT = re.compile(rb"""
+	["'`]
+	(
+		(?:https?:)?//[A-Za-z0-9.\-]{1,253}(?::\d{1,5})?(?:[/?#][^"'`\s<>\\]{0,2048})?
+		|
+		/[A-Za-z0-9_\-.~%][^"'`\s<>\\]{0,2048}
+		|
+		\.{1,2}/[A-Za-z0-9_\-.~%][^"'`\s<>\\]{0,2048}
+	)
+	["'`]
+""", re.VERBOSE)
+
+__REFRESH = re.compile(r"^\s*[\d.]*\s*[;,]?\s*(?:url\s*=\s*)?[\"']?([^\"'\s]+)", re.IGNORECASE)
+
+def __get_parser(encoding: str) -> lxml.etree.HTMLParser:
+	"""
+	Get a cached HTML parser for the specified encoding.\n
+	If the encoding is not supported, the parser will detect the encoding on its own.
+	"""
+	if encoding not in __PARSERS:
+		try:
+			__PARSERS[encoding] = lxml.etree.HTMLParser(recover = True, encoding = encoding)
+		except LookupError:
+			__PARSERS[encoding] = lxml.etree.HTMLParser(recover = True)
+	return __PARSERS[encoding]
+
+def __classify(url: str, link: str, in_scope: dict[str, None], out_of_scope: dict[str, None], is_in_scope: typing.Callable[[str], bool]):
+	"""
+	Add a link to either in-scope or out-of-scope links.\n
+	Relative links are resolved against the URL, and are always in the scope.\n
+	Links with a scheme other than HTTP and HTTPS are ignored.
+	"""
+	try:
+		obj = urllib.parse.urlsplit(link)
+	except ValueError:
+		return
+	if obj.scheme and obj.scheme.lower() not in __SCHEME_WHITELIST:
+		return
+	if not obj.scheme and not obj.netloc:
+		in_scope[urllib.parse.urljoin(url, link)] = None
+	elif obj.scheme and obj.netloc:
+		if is_in_scope(obj.netloc):
+			in_scope[link] = None
+		else:
+			out_of_scope[link] = None
+
+def endpoints(content: str | bytes):
+	"""
+	Extract endpoints, i.e. URLs and paths, from a JavaScript content, lazily, one match at a time.\n
+	Bytes are scanned as is, so a large bundle is never decoded or copied as a whole.\n
+	Paths without letters, e.g. dates, are skipped, and template literals are cut at their first placeholder, e.g. '/api/${id}' becomes '/api/'.
+	"""
+	if isinstance(content, str):
+		content = content.encode("UTF-8")
+	for match in __ENDPOINT.finditer(content):
+		link = match.group(1).decode("UTF-8", errors = "ignore").split("${", 1)[0]
+		if not any(char.isalpha() for char in link): # e.g. '/12/31/2020'
+			continue
+		if len(link) > 1:
+			yield link
+
+def __extract_endpoints(url: str, content: str | bytes, in_scope: dict[str, None], out_of_scope: dict[str, None], is_in_scope: typing.Callable[[str], bool]):
+	"""
+	Extract endpoints from a JavaScript content, and classify them.\n
+	Protocol-relative URLs get the scheme of the URL.
+	"""
+	for link in endpoints(content):
+		__classify(url, urllib.parse.urljoin(url, link) if link.startswith("//") else link, in_scope, out_of_scope, is_in_scope)
+
+def __get_srcset(srcset: str):
+	"""
+	Get URLs from a 'srcset' attribute, e.g. 'small.png 1x, large.png 2x'.
+	"""
+	return [candidate.split()[0] for candidate in srcset.split(",") if candidate.strip()]
+
+def __get_refresh(content: str):
+	"""
+	Get a URL from a 'meta' refresh, e.g. '5; url=/home'.
+	"""
+	match = __REFRESH.match(content)
+	return match.group(1) if match and not match.group(1)[0].isdigit() else ""
+
+def __is_external_script(element: lxml.etree._Element):
+	"""
+	Check if a 'script' element loads an executable script from a URL.\n
+	Inline scripts, e.g. tracking snippets, and data blocks, e.g. 'application/ld+json', are not.
+	"""
+	return bool(element.get("src")) and element.get("type", "").split(";")[0].strip().lower() in __SCRIPT_TYPES
+
+def links(url: str, content: str | bytes, encoding: str, is_in_scope: typing.Callable[[str], bool], extended: bool = False):
+	"""
+	Extract links from an HTML content in a single pass over the parsed tree.\n
+	If extended, links are also extracted from 'srcset', 'form', 'iframe', and 'meta' refresh, and endpoints from inline scripts.\n
+	Relative links are resolved against the URL, and are always in the scope.\n
+	Returns two unique lists, i.e. in-scope and out-of-scope links, and the number of occurrences of each tag of interest, where only external executable scripts are counted.
+	"""
+	in_scope     = {}
+	out_of_scope = {}
+	tags         = {}
+	attributes   = __EXTENDED_LINK_ATTRIBUTES if extended else __LINK_ATTRIBUTES
+	if isinstance(content, str):
+		content  = content.encode("UTF-8")
+		encoding = "UTF-8"
+	root = lxml.etree.fromstring(content, __get_parser(encoding)) if content else None
+	if root is not None:
+		for element in root.iter(*attributes, *__COUNTED_TAGS, *(__SRCSET_TAGS + ["meta"] if extended else [])):
+			if element.tag != "script" or __is_external_script(element):
+				tags[element.tag] = tags.get(element.tag, 0) + 1
+			if element.tag in attributes:
+				link = element.get(attributes[element.tag])
+				if link:
+					__classify(url, link, in_scope, out_of_scope, is_in_scope)
+				elif extended and element.tag == "script" and element.text:
+					__extract_endpoints(url, element.text, in_scope, out_of_scope, is_in_scope)
+			if not extended:
+				continue
+			if element.tag in __SRCSET_TAGS:
+				for link in __get_srcset(element.get("srcset", "")):
+					__classify(url, link, in_scope, out_of_scope, is_in_scope)
+			elif element.tag == "meta" and element.get("http-equiv", "").lower() == "refresh":
+				link = __get_refresh(element.get("content", ""))
+				if link:
+					__classify(url, link, in_scope, out_of_scope, is_in_scope)
+	return list(in_scope), list(out_of_scope), tags
+
+def scripts(url: str, content: str | bytes, is_in_scope: typing.Callable[[str], bool]):
+	"""
+	Extract endpoints from a JavaScript content, e.g. a bundle.\n
+	Relative endpoints are resolved against the URL, and are always in the scope.\n
+	Returns two unique lists, i.e. in-scope and out-of-scope links, and no tags.
+	"""
+	in_scope     = {}
+	out_of_scope = {}
+	__extract_endpoints(url, content, in_scope, out_of_scope, is_in_scope)
+	return list(in_scope), list(out_of_scope), {}
+
+def urls(url: str, links: list[str], is_in_scope: typing.Callable[[str], bool]):
+	"""
+	Classify links found elsewhere, e.g. captured from the network traffic of the headless browser.\n
+	Relative links are resolved against the URL, and are always in the scope.\n
+	Returns two unique lists, i.e. in-scope and out-of-scope links.
+	"""
+	in_scope     = {}
+	out_of_scope = {}
+	for link in links:
+		__classify(url, link, in_scope, out_of_scope, is_in_scope)
+	return list(in_scope), list(out_of_scope)
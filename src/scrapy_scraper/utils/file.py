@@ -2,7 +2,7 @@
 
 from . import array
 
-import os
+import os, typing
 
 __ENCODING = "ISO-8859-1"
 
@@ -41,6 +41,17 @@ def read_array(file: str):
 				tmp.append(line)
 	return array.unique(tmp)
 
+def read_lines(file: str) -> typing.Iterator[str]:
+	"""
+	Read a file line by line, lazily.\n
+	Whitespace will be stripped from each line, and empty lines will be skipped.
+	"""
+	with open(file, "r", encoding = __ENCODING) as stream:
+		for line in stream:
+			line = line.strip()
+			if line:
+				yield line
+
 def overwrite(text: str, out: str):
 	"""
 	Write a text to an output file.\n
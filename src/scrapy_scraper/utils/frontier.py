@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+import abc, asyncio, concurrent.futures, json, os, socket, sqlite3, typing, urllib.parse
+
+__SCHEMES = ["sqlite", "redis"]
+PREFIX    = "scrapy_scraper"
+TIMEOUT   = 30
+BATCH     = 100 # URLs buffered before a push
+
+class Frontier(abc.ABC):
+	"""
+	Base class for a frontier, i.e. a queue of URLs to crawl, and their depths, shared between multiple crawler instances.\n
+	Each URL is queued only once, ever, and each queued URL is popped only once, i.e. each URL is crawled at most once across all the instances.
+	"""
+
+	@abc.abstractmethod
+	def push(self, entries: list[tuple[str, int]]) -> int:
+		"""
+		Queue the URLs, and their depths, that have never been queued before.\n
+		Returns the number of newly queued URLs.
+		"""
+
+	@abc.abstractmethod
+	def pop(self, count: int) -> list[tuple[str, int]]:
+		"""
+		Remove and return at most 'count' URLs, and their depths, from the queue.
+		"""
+
+	@abc.abstractmethod
+	def close(self):
+		"""
+		Close the connection to the frontier.
+		"""
+
+class SQLiteFrontier(Frontier):
+
+	def __init__(self, path: str):
+		"""
+		Class for a frontier stored in a local SQLite database.\n
+		Crawler instances on the same machine can share the same database file.
+		"""
+		self.__connection = sqlite3.connect(path, timeout = TIMEOUT, isolation_level = None)
+		self.__connection.execute("PRAGMA journal_mode = WAL")
+		self.__connection.execute("CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID")
+		self.__connection.execute("CREATE TABLE IF NOT EXISTS queue (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, depth INTEGER NOT NULL)")
+
+	def push(self, entries: list[tuple[str, int]]) -> int:
+		count = 0
+		if entries:
+			self.__connection.execute("BEGIN IMMEDIATE")
+			try:
+				for url, depth in entries:
+					if self.__connection.execute("INSERT OR IGNORE INTO seen (url) VALUES (?)", (url,)).rowcount:
+						self.__connection.execute("INSERT INTO queue (url, depth) VALUES (?, ?)", (url, depth))
+						count += 1
+				self.__connection.execute("COMMIT")
+			except BaseException:
+				self.__connection.execute("ROLLBACK")
+				raise
+		return count
+
+	def pop(self, count: int) -> list[tuple[str, int]]:
+		rows = []
+		if count > 0:
+			self.__connection.execute("BEGIN IMMEDIATE")
+			try:
+				rows = self.__connection.execute("SELECT id, url, depth FROM queue ORDER BY id LIMIT ?", (count,)).fetchall()
+				if rows:
+					self.__connection.execute("DELETE FROM queue WHERE id <= ?", (rows[-1][0],))
+				self.__connection.execute("COMMIT")
+			except BaseException:
+				self.__connection.execute("ROLLBACK")
+				raise
+		return [(url, depth) for _, url, depth in rows]
+
+	def close(self):
+		self.__connection.close()
+
+class RedisFrontier(Frontier):
+
+	def __init__(self, host: str, port: int, db: int, password: str):
+		"""
+		Class for a frontier stored on a Redis server, or any other server speaking the Redis protocol, e.g. Valkey.\n
+		Crawler instances on multiple machines can share the same server.\n
+		Deduplication relies on 'SADD' adding a URL to the set of seen URLs only once, so only one instance queues it.
+		"""
+		self.__socket = socket.create_connection((host, port), timeout = TIMEOUT)
+		self.__reader = self.__socket.makefile("rb")
+		self.__queue  = f"{PREFIX}:queue"
+		self.__seen   = f"{PREFIX}:seen"
+		if password:
+			self.__execute([["AUTH", password]])
+		if db:
+			self.__execute([["SELECT", db]])
+
+	def __execute(self, commands: list[list[typing.Any]]) -> list[typing.Any]:
+		"""
+		Send the commands in a single round trip, and return their replies.
+		"""
+		request = []
+		for command in commands:
+			request.append(f"*{len(command)}\r\n".encode("UTF-8"))
+			for argument in command:
+				argument = str(argument).encode("UTF-8")
+				request.append(f"${len(argument)}\r\n".encode("UTF-8") + argument + b"\r\n")
+		self.__socket.sendall(b"".join(request))
+		return [self.__read() for _ in commands]
+
+	def __read(self) -> typing.Any:
+		"""
+		Read a reply.
+		"""
+		line = self.__reader.readline()
+		if not line:
+			raise ConnectionError("Connection closed by the server")
+		kind, value = line[:1], line[1:-2].decode("UTF-8")
+		if kind == b"+":
+			return value
+		elif kind == b"-":
+			raise ConnectionError(value)
+		elif kind == b":":
+			return int(value)
+		elif kind == b"$":
+			if int(value) < 0:
+				return None
+			data = self.__reader.read(int(value) + 2)
+			return data[:-2].decode("UTF-8")
+		elif kind == b"*":
+			if int(value) < 0:
+				return None
+			return [self.__read() for _ in range(int(value))]
+		raise ConnectionError(f"Invalid reply: {line!r}")
+
+	def push(self, entries: list[tuple[str, int]]) -> int:
+		if entries:
+			added   = self.__execute([["SADD", self.__seen, url] for url, _ in entries])
+			entries = [entry for entry, is_added in zip(entries, added) if is_added]
+		if entries:
+			self.__execute([["RPUSH", self.__queue, *[json.dumps([url, depth]) for url, depth in entries]]])
+		return len(entries)
+
+	def pop(self, count: int) -> list[tuple[str, int]]:
+		values = self.__execute([["LPOP", self.__queue, count]])[0] if count > 0 else None
+		return [tuple(json.loads(value)) for value in values] if values else []
+
+	def close(self):
+		self.__reader.close()
+		self.__socket.close()
+
+def __get_path(obj: urllib.parse.SplitResult):
+	"""
+	Get the SQLite database file from a parsed frontier URL.\n
+	As with SQLAlchemy, 'sqlite:///file.db' is a relative path, and 'sqlite:////path/to/file.db' is an absolute path.
+	"""
+	return obj.netloc + obj.path if obj.netloc else obj.path[1:]
+
+def connect(url: str) -> Frontier:
+	"""
+	Connect to a frontier.\n
+	Supported URLs are 'sqlite:///file.db' and 'redis://[:password@]host[:port][/db]'.
+	"""
+	obj = urllib.parse.urlsplit(url)
+	if obj.scheme == "sqlite":
+		return SQLiteFrontier(__get_path(obj))
+	return RedisFrontier(obj.hostname or "127.0.0.1", obj.port or 6379, int(obj.path.strip("/") or 0), urllib.parse.unquote(obj.password or ""))
+
+class Client:
+
+	def __init__(self, url: str, on_error: typing.Callable[[str], None], batch: int = BATCH):
+		"""
+		Class for using a frontier from the reactor thread, without ever blocking it.\n
+		All the calls run in order in a single worker thread, so a locked database or a slow or hung server stalls only the worker, and the connection is only ever used by the thread that opened it.\n
+		Pushes are buffered, and sent once 'batch' URLs are buffered, or before the next pop, so a pop always sees the URLs pushed before it.\n
+		If a call fails, the connection is reopened and the call is retried once, after which the error is passed to 'on_error' for pushes, or raised for pops.\n
+		A URL may be lost if the connection fails after the frontier has executed a call, but no URL is ever crawled twice.
+		"""
+		self.__url      = url
+		self.__on_error = on_error
+		self.__batch    = batch
+		self.__buffer   = []
+		self.__frontier = None
+		self.__executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix = "frontier")
+
+	def __call(self, method: str, *args: typing.Any) -> typing.Any:
+		"""
+		Call a method of the frontier, and reconnect on failure.\n
+		Meant to be run in the worker thread.
+		"""
+		for attempt in range(2):
+			try:
+				if not self.__frontier:
+					self.__frontier = connect(self.__url)
+				return getattr(self.__frontier, method)(*args)
+			except (OSError, ValueError, sqlite3.Error): # e.g. the connection was reset, timed out, or the database is locked
+				self.__disconnect()
+				if attempt:
+					raise
+
+	def __disconnect(self):
+		"""
+		Close the connection to the frontier, if any.\n
+		Meant to be run in the worker thread.
+		"""
+		if self.__frontier:
+			try:
+				self.__frontier.close()
+			except (OSError, sqlite3.Error):
+				pass
+			self.__frontier = None
+
+	def __pushed(self, future: asyncio.Future):
+		"""
+		On push done callback.
+		"""
+		if not future.cancelled() and future.exception():
+			self.__on_error(str(future.exception()))
+
+	def push(self, entries: list[tuple[str, int]]):
+		"""
+		Buffer the URLs, and their depths, to queue, and push the buffer if it is full.
+		"""
+		self.__buffer.extend(entries)
+		if len(self.__buffer) >= self.__batch:
+			self.flush()
+
+	def flush(self):
+		"""
+		Push the buffered URLs, and their depths, without waiting for the push to finish.
+		"""
+		if self.__buffer:
+			asyncio.wrap_future(self.__executor.submit(self.__call, "push", self.__buffer)).add_done_callback(self.__pushed)
+			self.__buffer = []
+
+	async def pop(self, count: int) -> list[tuple[str, int]]:
+		"""
+		Push the buffered URLs, then remove and return at most 'count' URLs, and their depths, from the queue.
+		"""
+		self.flush()
+		return await asyncio.wrap_future(self.__executor.submit(self.__call, "pop", count))
+
+	def close(self):
+		"""
+		Push the buffered URLs, wait for the pending calls to finish, and close the connection to the frontier.
+		"""
+		future = self.__executor.submit(self.__call, "push", self.__buffer) if self.__buffer else None
+		self.__buffer = []
+		self.__executor.submit(self.__disconnect)
+		self.__executor.shutdown(wait = True)
+		if future and future.exception():
+			self.__on_error(str(future.exception()))
+
+def validate(url: str):
+	"""
+	Validate a frontier URL, and check if the frontier is reachable.
+	"""
+	success = False
+	message = ""
+	obj = urllib.parse.urlsplit(url)
+	if obj.scheme not in __SCHEMES:
+		message = f"Supported frontier URL schemes are 'sqlite' and 'redis': {url}"
+	elif obj.scheme == "sqlite" and not __get_path(obj):
+		message = f"SQLite database file is required: {url}"
+	elif obj.scheme == "sqlite" and os.path.isdir(__get_path(obj)):
+		message = f"\"{__get_path(obj)}\" is a directory"
+	elif obj.scheme == "redis" and not obj.path.strip("/").isdigit() and obj.path.strip("/"):
+		message = f"Redis database number must be numeric: {url}"
+	else:
+		try:
+			connect(url).close()
+			success = True
+		except (OSError, ValueError, sqlite3.Error) as ex:
+			message = f"Cannot connect to the frontier: {ex}"
+	return success, message
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+from . import stream
+
+from scrapy            import Spider, signals
+from scrapy.crawler    import Crawler
+from scrapy.exceptions import NotConfigured
+
+from twisted.internet      import task
+from twisted.web.resource  import Resource
+from twisted.web.server    import Site
+from twisted.web.http      import Request as TwistedRequest
+
+import datetime, time, typing
+
+PREFIX   = "scrapy_scraper"
+COUNTERS = ["crawled", "errors", "rendered", "cached", "requests", "responses", "retries", "exceptions", "bytes", "playwright_pages"]
+
+class Metrics:
+
+	def __init__(self, crawler: Crawler, out: str, interval: float, port: int):
+		"""
+		Class for exposing live crawl metrics.\n
+		Metrics are periodically appended to a JSONL file, and/or served in Prometheus' text format on a local HTTP endpoint.
+		"""
+		self.__crawler  = crawler
+		self.__out      = out
+		self.__interval = interval
+		self.__port     = port
+		self.__stream   = None
+		self.__task     = None
+		self.__listener = None
+		self.__start    = time.monotonic()
+		self.__last     = (self.__start, 0)
+
+	@classmethod
+	def from_crawler(cls, crawler: Crawler):
+		"""
+		Scrapy's extension factory.
+		"""
+		out  = crawler.settings.get("METRICS_FILE", "")
+		port = crawler.settings.getint("METRICS_PORT", 0)
+		if not out and not port:
+			raise NotConfigured
+		metrics = cls(crawler, out, crawler.settings.getfloat("METRICS_INTERVAL", 10), port)
+		crawler.signals.connect(metrics.spider_opened, signal = signals.spider_opened)
+		crawler.signals.connect(metrics.spider_closed, signal = signals.spider_closed)
+		return metrics
+
+	def spider_opened(self, spider: Spider):
+		"""
+		On spider opened callback.
+		"""
+		if self.__out:
+			self.__stream = stream.Stream(self.__out, flush_size = 1)
+			self.__task = task.LoopingCall(self.__dump)
+			self.__task.start(self.__interval, now = False)
+		if self.__port:
+			from twisted.internet import reactor # importing the reactor at the module level would install the default one
+			self.__listener = reactor.listenTCP(self.__port, Site(Endpoint(self)), interface = "127.0.0.1")
+
+	def spider_closed(self, spider: Spider, reason: str):
+		"""
+		On spider closed callback.\n
+		Dumps the final metrics.
+		"""
+		if self.__task:
+			self.__task.stop()
+		if self.__stream:
+			self.__dump()
+			self.__stream.close()
+		if self.__listener:
+			self.__listener.stopListening()
+
+	def __dump(self):
+		"""
+		Append the current metrics, and the crawl rate since the previous dump, to the output file.
+		"""
+		metrics = self.get()
+		now     = time.monotonic()
+		last, previous = self.__last
+		self.__last    = (now, metrics["crawled"])
+		metrics["crawled_per_second"] = round((metrics["crawled"] - previous) / (now - last), 3) if now > last else 0
+		self.__stream.write(metrics)
+
+	def get(self) -> dict[str, typing.Any]:
+		"""
+		Get the current metrics.
+		"""
+		stats       = self.__crawler.stats
+		engine      = self.__crawler.engine
+		queue       = 0
+		in_flight   = {}
+		concurrency = {}
+		if engine and engine.slot and engine.slot.scheduler:
+			queue = len(engine.slot.scheduler)
+		if engine and engine.downloader:
+			in_flight   = {key: len(slot.active) for key, slot in engine.downloader.slots.items() if slot.active}
+			concurrency = {key: slot.concurrency for key, slot in engine.downloader.slots.items()}
+		return {
+			"timestamp"             : datetime.datetime.now().isoformat(timespec = "seconds"),
+			"elapsed"               : round(time.monotonic() - self.__start, 3),
+			"crawled"               : stats.get_value(f"{PREFIX}/crawled", 0),
+			"errors"                : stats.get_value(f"{PREFIX}/errors", 0),
+			"rendered"              : stats.get_value(f"{PREFIX}/rendered", 0),
+			"cached"                : stats.get_value(f"{PREFIX}/cached", 0),
+			"queue"                 : queue,
+			"in_flight"             : sum(in_flight.values()),
+			"in_flight_per_domain"  : in_flight,
+			"concurrency_per_domain": concurrency,
+			"requests"              : stats.get_value("downloader/request_count", 0),
+			"responses"             : stats.get_value("downloader/response_count", 0),
+			"retries"               : stats.get_value("retry/count", 0),
+			"exceptions"            : stats.get_value("downloader/exception_count", 0),
+			"bytes"                 : stats.get_value("downloader/response_bytes", 0),
+			"playwright_pages"      : stats.get_value("playwright/page_count", 0),
+			"bloom_bytes"           : stats.get_value(f"{PREFIX}/requests_bloom_bytes", 0) + stats.get_value(f"{PREFIX}/links_bloom_bytes", 0)
+		}
+
+class Endpoint(Resource):
+	"""
+	Local HTTP endpoint serving the metrics in Prometheus' text format.
+	"""
+	isLeaf = True
+
+	def __init__(self, metrics: Metrics):
+		super().__init__()
+		self.__metrics = metrics
+
+	def render_GET(self, request: TwistedRequest):
+		request.setHeader(b"Content-Type", b"text/plain; version=0.0.4; charset=utf-8")
+		lines = []
+		for name, value in self.__metrics.get().items():
+			if isinstance(value, dict):
+				lines.append(f"# TYPE {PREFIX}_{name} gauge")
+				for label, number in value.items():
+					lines.append(f"{PREFIX}_{name}{{domain=\"{escape(label)}\"}} {number}")
+			elif name in COUNTERS:
+				lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+				lines.append(f"{PREFIX}_{name}_total {value}")
+			elif isinstance(value, (int, float)):
+				lines.append(f"# TYPE {PREFIX}_{name} gauge")
+				lines.append(f"{PREFIX}_{name} {value}")
+		return ("\n".join(lines) + "\n").encode("UTF-8")
+
+def escape(label: str):
+	"""
+	Escape a Prometheus' label value.
+	"""
+	return label.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
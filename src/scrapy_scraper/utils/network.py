@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import typing, weakref
+
+if typing.TYPE_CHECKING:
+	from playwright.async_api import Request as PlaywrightRequest, Page as PlaywrightPage
+
+CAPTURED = weakref.WeakKeyDictionary() # URLs requested by each page, in the current process
+
+def capture(request: "PlaywrightRequest"):
+	"""
+	Scrapy Playwright's page event handler for the 'request' event.\n
+	Records every URL a page requests, e.g. XHR and fetch requests, in the order of the requests.\n
+	The event is emitted before the request is routed, so blocked requests are recorded too.
+	"""
+	from playwright.async_api import Error as PlaywrightError
+	try:
+		page = request.frame.page
+	except PlaywrightError: # e.g. a service worker's request has no frame
+		return
+	if page not in CAPTURED:
+		CAPTURED[page] = {}
+	CAPTURED[page][request.url] = None
+
+def pop(page: "PlaywrightPage"):
+	"""
+	Get and forget the unique URLs requested by a page.
+	"""
+	return list(CAPTURED.pop(page, {}))
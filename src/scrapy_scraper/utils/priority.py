@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+from . import url
+
+import abc, urllib.parse
+
+JS_PRIORITY       = 1
+TEMPLATE_PRIORITY = 1
+
+class Scorer(abc.ABC):
+	"""
+	Base class for a scoring hook.\n
+	Scores of all the scoring hooks are summed into the priority of a request, i.e. requests with higher scores are crawled sooner.\n
+	Custom scoring hooks subclass this class, and are specified by their import path, e.g. 'package.module.Scorer'.
+	"""
+
+	@abc.abstractmethod
+	def score(self, link: str, depth: int) -> int:
+		"""
+		Score a link about to be crawled at the specified depth.
+		"""
+
+class JavaScriptScorer(Scorer):
+	"""
+	Prefer JavaScript files.
+	"""
+
+	def score(self, link: str, depth: int) -> int:
+		return JS_PRIORITY if urllib.parse.urlsplit(link).path.lower().endswith(".js") else 0
+
+class TemplateScorer(Scorer):
+	"""
+	Prefer links with path templates not seen before, e.g. the first '/post/{n}' over the rest.
+	"""
+
+	def __init__(self):
+		self.__seen = set()
+
+	def score(self, link: str, depth: int) -> int:
+		template = url.get_path_template(link)
+		if template in self.__seen:
+			return 0
+		self.__seen.add(template)
+		return TEMPLATE_PRIORITY
+
+SCORERS = {
+	"js"       : JavaScriptScorer,
+	"templates": TemplateScorer
+}
+
+def load(name: str) -> Scorer:
+	"""
+	Load a built-in scoring hook by its name, or a custom one by its import path.
+	"""
+	from scrapy.utils.misc import load_object # lazy, Scrapy is slow to import
+	return (SCORERS[name] if name in SCORERS else load_object(name))()
+
+def validate(names: list[str]):
+	"""
+	Validate scoring hooks.
+	"""
+	success = True
+	message = ""
+	for name in names:
+		try:
+			if not isinstance(load(name), Scorer):
+				success = False
+				message = f"Scoring hook must subclass '{__name__}.Scorer': {name}"
+		except (ImportError, AttributeError, NameError, ValueError, TypeError) as ex:
+			success = False
+			message = f"Cannot load the scoring hook '{name}': {ex}"
+		if not success:
+			break
+	return success, message
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import asyncio, typing
+
+if typing.TYPE_CHECKING:
+	from playwright.async_api import Page as PlaywrightPage
+
+NETWORK_IDLE = "networkidle"
+MUTATIONS    = "mutations"
+SELECTOR     = "selector:"
+
+TIMEOUT      = 10  # default hard maximum in seconds
+QUIET_PERIOD = 0.5 # in seconds, same as Playwright's network idle
+
+# resolves once the DOM has not changed for the quiet period, or once the hard maximum is reached
+__MUTATIONS_QUIET = """
+([quiet, max]) => new Promise((resolve) => {
+	let timer = null;
+	const done = () => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(); };
+	const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quiet); });
+	observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+	timer = setTimeout(done, quiet);
+	const cap = setTimeout(done, max);
+})
+"""
+
+def validate(readiness: str):
+	"""
+	Validate a readiness strategy, i.e. 'networkidle', 'mutations', or 'selector:<css>'.
+	"""
+	success = True
+	message = ""
+	if readiness.startswith(SELECTOR):
+		if not readiness[len(SELECTOR):].strip():
+			success = False
+			message = "CSS selector of the readiness strategy is required"
+	elif readiness not in [NETWORK_IDLE, MUTATIONS]:
+		success = False
+		message = "Supported readiness strategies are 'networkidle', 'mutations', and 'selector:<css>'"
+	return success, message
+
+async def wait(page: "PlaywrightPage", readiness: str, timeout: float):
+	"""
+	Wait until a page is ready, i.e. until the network is idle, until the DOM has not changed for a quiet period, or until a CSS selector matches an element.\n
+	Never waits longer than the timeout in seconds.\n
+	Returns 'True' if the page is ready, or 'False' if the timeout is reached, or if the page could not be checked, e.g. it navigated away, in which case the page should be used as is.
+	"""
+	from playwright.async_api import Error as PlaywrightError # also the base of Playwright's timeout error
+	ready = True
+	try:
+		if readiness == NETWORK_IDLE:
+			await page.wait_for_load_state("networkidle", timeout = timeout * 1000)
+		elif readiness == MUTATIONS:
+			await asyncio.wait_for(page.evaluate(__MUTATIONS_QUIET, [QUIET_PERIOD * 1000, timeout * 1000]), timeout + QUIET_PERIOD) # in case the page's event loop is blocked
+		else:
+			await page.wait_for_selector(readiness[len(SELECTOR):].strip(), state = "attached", timeout = timeout * 1000)
+	except (PlaywrightError, asyncio.TimeoutError):
+		ready = False
+	return ready
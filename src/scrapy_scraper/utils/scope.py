@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+from scrapy                                import Spider
+from scrapy.http                           import Request
+from scrapy.utils.httpobj                  import urlparse_cached
+from scrapy.downloadermiddlewares.offsite import OffsiteMiddleware as ScrapyOffsiteMiddleware
+
+class Scope:
+
+	def __init__(self, domains: list[str] | None):
+		"""
+		Class for checking if a domain name is in the scope.\n
+		Whitelisted domain names are kept in a hash set, so a check costs one lookup per label of the domain name, regardless of the whitelist size.\n
+		If 'None', the whitelist starts empty, and domain names are added to it as they are discovered, e.g. as the start URLs are read.
+		"""
+		self.__everything = domains is not None and not domains
+		self.__domains    = set(domain.lower() for domain in domains or [])
+
+	def add(self, domain: str):
+		"""
+		Whitelist a domain name.
+		"""
+		self.__domains.add(domain.lower())
+
+	def is_in_scope(self, domain: str):
+		"""
+		Check if a domain name or any of its parent domain names is whitelisted.\n
+		If the whitelist is off, all domain names are in the scope.
+		"""
+		if self.__everything:
+			return True
+		domain = domain.lower()
+		while True:
+			if domain in self.__domains:
+				return True
+			index = domain.find(".")
+			if index < 0:
+				return False
+			domain = domain[index + 1:]
+
+class OffsiteMiddleware(ScrapyOffsiteMiddleware):
+	"""
+	Scrapy's offsite downloader middleware, but backed by the domain name index instead of a regular expression with one alternative per whitelisted domain name.\n
+	If the spider has its own scope, the scope is shared, so domain names whitelisted later are seen by both.
+	"""
+
+	def spider_opened(self, spider: Spider):
+		self.__scope = getattr(spider, "scope", None) or Scope(getattr(spider, "allowed_domains", None) or [])
+
+	def should_follow(self, request: Request, spider: Spider):
+		return self.__scope.is_in_scope(urlparse_cached(request).hostname or "")
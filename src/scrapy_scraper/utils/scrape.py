@@ -1,18 +1,36 @@
 #!/usr/bin/env python3
 
-from . import array, file, general, stopwatch
-
-from bs4 import BeautifulSoup
+from . import array, cache, dedup, download, extract, file, frontier, general, network, priority, readiness, scope, screenshot, seed, shard, sitemap, size, stopwatch, stream, trap
+from . import url as urlutil
 
 from twisted.python.failure             import Failure
 from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.exceptions                  import DontCloseSpider
+from twisted.internet                   import task
 from scrapy.http                        import Request, HtmlResponse
-from playwright.async_api               import Request as PlaywrightRequest, Page as PlaywrightPage, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
-import asyncio, dataclasses, jsbeautifier, os, random, scrapy, scrapy.crawler, scrapy.utils.project, typing, urllib.parse
+import asyncio, collections, dataclasses, hashlib, lxml.etree, multiprocessing, os, random, scrapy, scrapy.crawler, scrapy.utils.project, sqlite3, typing, urllib.parse
+
+if typing.TYPE_CHECKING: # Playwright is imported lazily, only if using the headless browser
+	from playwright.async_api import Request as PlaywrightRequest, Page as PlaywrightPage
 
 STATUS_ERROR = -1
 NO_RECURSION = -1
+JOB_STREAM   = "results.jsonl"
+HASH_INDEX   = "index.jsonl"
+
+DOWNLOAD_WORKERS    = os.cpu_count() or 1
+DOWNLOAD_BACKLOG    = DOWNLOAD_WORKERS * 4
+DOWNLOAD_SPOOL_SIZE = 1024 * 1024 # in bytes, larger files are spooled to disk before beautifying
+
+RENDER_MIN_ANCHORS = 3 # pages with a 'noscript' fallback and fewer anchors need rendering
+
+MAX_POOLED_CONTEXTS  = 100         # across all the pools, except the screenshot pool
+OVERFLOW_POOL        = "#overflow" # cannot clash with a domain name
+CONTEXT_IDLE_TIMEOUT = 30          # in seconds, pools without queued requests are closed after
+
+SHARD_POLL_INTERVAL = 0.1
+SHARD_POLL_SIZE     = 100
 
 @dataclasses.dataclass
 class Crawled:
@@ -34,54 +52,168 @@ class ScrapyScraperSpider(scrapy.Spider):
 
 	def __init__(
 		self,
-		urls           : list[str],
-		whitelist      : list[str],
-		playwright     : bool,
-		playwright_wait: float,
-		recursion      : int,
-		headers        : dict[str, str],
-		cookies        : dict[str, str],
-		user_agents    : list[str],
-		proxy          : str,
-		downloads      : str,
-		screenshots    : str,
-		out            : str,
-		debug          : bool
+		urls                      : seed.Seeds,
+		whitelist                 : list[str] | None,
+		playwright                : bool,
+		playwright_hybrid         : bool,
+		playwright_wait           : float,
+		playwright_contexts       : int,
+		playwright_context_pages  : int,
+		playwright_contexts_domain: bool,
+		playwright_network        : bool,
+		playwright_readiness      : str,
+		recursion                 : int,
+		scoring                   : list[str],
+		canonicalize              : bool,
+		sitemaps                  : bool,
+		max_html                  : int,
+		extended_extraction       : bool,
+		headers                   : dict[str, str],
+		cookies                   : dict[str, str],
+		user_agents               : list[str],
+		proxy                     : str,
+		downloads                 : str,
+		download_hash             : bool,
+		screenshots               : str,
+		screenshot_viewport       : dict[str, int],
+		screenshot_format         : str,
+		screenshot_quality        : int,
+		screenshot_thumbnail      : int,
+		screenshot_workers        : int,
+		out                       : str,
+		stream_out                : str,
+		no_compact                : bool,
+		bloom_filter              : float,
+		job                       : str,
+		cache                     : cache.Cache | None,
+		frontier_url              : str,
+		shard                     : shard.Shard | None,
+		debug                     : bool
 	):
 		"""
-		Class for managing Scrapy's spider.
-		"""
-		self.name              = "ScrapyScraperSpider"
-		self.start_urls        = urls
-		self.allowed_domains   = whitelist
-		self.__playwright      = playwright
-		self.__playwright_wait = playwright_wait
-		self.__crawl           = recursion > NO_RECURSION
-		self.__headers         = headers
-		self.__cookies         = cookies
-		self.__user_agents     = user_agents
-		self.__user_agents_len = len(self.__user_agents)
-		self.__proxy           = proxy
-		self.__downloads       = downloads
-		self.__screenshots     = screenshots
-		self.__out             = out
-		self.__debug           = debug
-		self.__context         = 0
-		self.__collection      = Collection()
+		Class for managing Scrapy's spider.\n
+		If taking screenshots, the pages are rotated through a dedicated pool of browser contexts with the specified viewport, and only as many screenshots as there are workers are captured at once.\n
+		If a readiness strategy is specified, the page content is fetched as soon as the page is ready, instead of after the fixed wait time, which becomes the maximum wait time.\n
+		If capturing the network traffic of the headless browser, every URL a page requests, including the blocked ones, is classified and collected as an extracted link.\n
+		If the whitelist is 'None', the domain names of the start URLs are whitelisted as the start URLs are read.\n
+		If canonicalizing, the URLs are canonicalized before they are crawled.\n
+		If seeding from sitemaps, the sitemaps of each start URL's host are parsed incrementally, and their URLs are fed to the scheduler lazily, as if linked from the start URL.\n
+		If the HTML size is limited, the content rendered by the headless browser is truncated too, the rest of the size limits are enforced while downloading.\n
+		If using the extended extraction, endpoints are extracted from JavaScript files and inline scripts, and links from more HTML elements.\n
+		If a cache is specified, responses are revalidated against the cache, and their cached links are replayed if unchanged.\n
+		If a frontier is specified, the URLs to crawl are pulled from and pushed to the frontier shared with other crawler instances, off the reactor thread.\n
+		If a shard is specified, only the URLs owned by the shard are crawled, and the rest are routed to their owning shards.
+		"""
+		self.name                         = "ScrapyScraperSpider"
+		self.allowed_domains              = whitelist or []
+		self.scope                        = scope.Scope(whitelist) # shared with the offsite middleware
+		self.__seeds                      = urls
+		self.__derive_scope               = whitelist is None
+		self.__playwright                 = playwright
+		self.__playwright_hybrid          = playwright_hybrid
+		self.__playwright_wait            = playwright_wait
+		self.__playwright_contexts        = playwright_contexts
+		self.__playwright_context_pages   = playwright_context_pages
+		self.__playwright_contexts_domain = playwright_contexts_domain
+		self.__playwright_network         = playwright_network
+		self.__playwright_readiness       = playwright_readiness
+		self.__crawl                      = recursion > NO_RECURSION
+		self.__scorers                    = [priority.load(name) for name in scoring]
+		self.__canonicalize               = canonicalize
+		self.__sitemaps                   = sitemaps
+		self.__max_html                   = max_html
+		self.__extended_extraction        = extended_extraction
+		self.__headers                    = headers
+		self.__cookies                    = cookies
+		self.__user_agents                = user_agents
+		self.__user_agents_len            = len(self.__user_agents)
+		self.__proxy                      = proxy
+		self.__downloads                  = downloads
+		self.__download_hash              = download_hash
+		self.__screenshots                = screenshots
+		self.__screenshot_viewport        = screenshot_viewport
+		self.__screenshot_format          = screenshot_format
+		self.__screenshot_quality         = screenshot_quality
+		self.__screenshot_thumbnail       = screenshot_thumbnail
+		self.__screenshot_workers         = screenshot_workers
+		self.__screenshot_slots           = asyncio.Semaphore(screenshot_workers)
+		self.__out                        = out
+		self.__stream_out                 = stream_out
+		self.__no_compact                 = no_compact
+		self.__bloom_filter               = bloom_filter
+		self.__job                        = job
+		self.__cache                      = cache
+		self.__frontier                   = frontier.Client(frontier_url, self.__frontier_error) if frontier_url else None
+		self.__shard                      = shard
+		self.__debug                      = debug
+		self.__pulling                    = False
+		self.__pull_again                 = False
+		self.__drained                    = False
+		self.__context                    = 0
+		self.__context_counts             = {}
+		self.__context_generations        = {}
+		self.__pool_queued                = {}
+		self.__context_queued             = {}
+		self.__pooled_contexts            = {}
+		self.__pool_epoch                 = 0
+		self.__pool_epochs                = {}
+		self.__idle_pools                 = {}
+		self.__overflowed                 = False
+		self.__collection                 = Collection()
+		self.__stream                     = stream.Stream(self.__stream_out) if self.__stream_out else None
+		self.__seen                       = dedup.ScalableBloomFilter(self.__bloom_filter) if self.__bloom_filter else dedup.RecentSet() if self.__stream else set()
+		self.__pool                       = download.Pool(self.__get_download_workers(), DOWNLOAD_BACKLOG) if self.__downloads or self.__screenshots else None
+		self.__pending                    = set()
+		self.__index                      = stream.Stream(self.__get_hash_index()) if self.__download_hash else None
+		self.__receiver                   = None
+		self.__closing                    = False
+		self.__sitemap_links              = collections.deque()
+		self.__sitemaps_seen              = set()
+
+	@classmethod
+	def from_crawler(cls, crawler: scrapy.crawler.Crawler, *args, **kwargs):
+		"""
+		Scrapy's spider factory.\n
+		If pulling from a frontier, if sharded, or if seeding from sitemaps, the spider is kept open until the whole crawl is done.
+		"""
+		spider = super().from_crawler(crawler, *args, **kwargs)
+		if spider.__frontier or spider.__shard or spider.__sitemaps:
+			crawler.signals.connect(spider.__idle, signal = scrapy.signals.spider_idle)
+		if spider.__playwright_contexts or spider.__screenshots:
+			crawler.signals.connect(spider.__scheduled, signal = scrapy.signals.request_scheduled)
+			crawler.signals.connect(spider.__dropped, signal = scrapy.signals.request_dropped)
+		return spider
+
+	def __get_download_workers(self):
+		"""
+		Get the number of download workers.\n
+		If sharded, the CPU cores are split between the shards.
+		"""
+		return max(1, DOWNLOAD_WORKERS // self.__shard.count) if self.__shard else DOWNLOAD_WORKERS
+
+	def __get_hash_index(self):
+		"""
+		Get the hash index file.\n
+		If sharded, each shard has its own index file.
+		"""
+		index = os.path.join(self.__downloads, HASH_INDEX)
+		return self.__shard.suffix(index) if self.__shard else index
 
 	def __print_start_urls(self):
 		"""
 		Print start URLS.
 		"""
 		general.print_green("Start URLs:")
-		for url in self.start_urls:
-			print(url)
+		print(self.__seeds.source)
 
 	def __print_allowed_domains(self):
 		"""
 		Print allowed [sub]domains.
 		"""
-		if self.allowed_domains:
+		if self.__derive_scope:
+			general.print_cyan("Allowed [sub]domains:")
+			print("*.<domain names of the start URLs, as they are read>")
+		elif self.allowed_domains:
 			general.print_cyan("Allowed [sub]domains:")
 			for domain in self.allowed_domains:
 				print(f"*.{domain}")
@@ -90,22 +222,68 @@ class ScrapyScraperSpider(scrapy.Spider):
 
 	def start_requests(self):
 		"""
-		Main method.
+		Main method.\n
+		Start URLs are read lazily, i.e. Scrapy's engine pulls the next start request only once there is room for it.
 		"""
-		self.__print_start_urls()
-		self.__print_allowed_domains()
-		print(general.get_timestamp("Collecting..."))
-		print("Press CTRL + C to exit early - results will be saved, please be patient")
-		for url in self.start_urls:
-			yield scrapy.Request(
+		if not self.__shard or self.__shard.index == 0:
+			self.__print_start_urls()
+			self.__print_allowed_domains()
+			print(general.get_timestamp("Collecting..."))
+			if self.__job:
+				print("Press CTRL + C to pause - run again with the same job directory to resume, please be patient")
+			else:
+				print("Press CTRL + C to exit early - results will be saved, please be patient")
+		if self.__job: # persisted by Scrapy's spider state extension, so the requests restored from the job directory are accounted for
+			self.__context             = self.state.get("context", 0)
+			self.__context_counts      = self.state.setdefault("context_counts", {})
+			self.__context_generations = self.state.setdefault("context_generations", {})
+			self.__pool_queued         = self.state.setdefault("pool_queued", {})
+			self.__context_queued      = self.state.setdefault("context_queued", {})
+			self.__pool_epoch          = self.state.get("pool_epoch", 0)
+			self.__pool_epochs         = self.state.setdefault("pool_epochs", {})
+		if self.__shard:
+			self.__receiver = task.LoopingCall(self.__receive)
+			self.__receiver.start(SHARD_POLL_INTERVAL, now = False)
+		origins = set()
+		for url in self.__read_start_urls():
+			if self.__sitemaps:
+				yield from self.__get_seeding_requests(url, origins)
+			if self.__frontier:
+				self.__frontier.push([(url, 0)])
+				self.__refill()
+				continue
+			if self.__shard and not self.__shard.owns(url):
+				continue
+			yield self.__revalidate(scrapy.Request(
 				url         = url,
 				headers     = self.__get_headers(),
 				cookies     = self.__cookies,
-				meta        = self.__get_metadata(True, True),
+				meta        = self.__get_metadata(url, True, True, bool(self.__screenshots)),
 				errback     = self.__error,
 				callback    = self.__success,
 				dont_filter = False
-			)
+			))
+		if self.__frontier:
+			self.__frontier.flush()
+			self.__refill()
+
+	def __read_start_urls(self):
+		"""
+		Read the start URLs lazily, and skip the invalid ones.\n
+		If the whitelist is derived from the start URLs, the domain names are whitelisted as the URLs are read, and links to domain names whitelisted later are reclassified once the crawl is done.
+		"""
+		for link, message in self.__seeds.read():
+			if not message and self.__derive_scope:
+				domain = urlutil.extract_fqdn(link)
+				if domain:
+					self.scope.add(domain)
+				else:
+					message = f"No valid domain name was found in the URL for domain whitelisting: {link}"
+			if message:
+				self.crawler.stats.inc_value("scrapy_scraper/invalid_start_urls")
+				general.print_red(message)
+				continue
+			yield urlutil.canonicalize(link) if self.__canonicalize else link
 
 	def __get_headers(self) -> dict[str, str]:
 		"""
@@ -136,20 +314,34 @@ class ScrapyScraperSpider(scrapy.Spider):
 			user_agent = self.__user_agents[random.randint(0, self.__user_agents_len - 1)]
 		return user_agent
 
-	def __get_metadata(self, is_start_url = False, take_screenshot = False) -> dict[str, typing.Any]:
+	def __get_metadata(self, url: str, is_start_url = False, take_screenshot = False, render = False) -> dict[str, typing.Any]:
 		"""
-		Get Scrapy's request metadata.
+		Get Scrapy's request metadata.\n
+		In the hybrid mode, only pages that need JavaScript rendering are fetched with Playwright's headless browser.
 		"""
 		self.__context += 1
+		if self.__job:
+			self.state["context"] = self.__context # persisted by Scrapy's spider state extension
+		playwright = self.__playwright or render
 		tmp                                = {}
-		tmp["playwright"                 ] = self.__playwright
+		tmp["playwright"                 ] = playwright
 		tmp["playwright_context"         ] = str(self.__context)
-		tmp["playwright_include_page"    ] = self.__playwright
+		is_screenshot = playwright and take_screenshot and bool(self.__screenshots)
+		if is_screenshot:
+			tmp["context_pool"] = (screenshot.POOL, self.__screenshot_workers) # custom attribute, the pooled context is assigned once the request is scheduled
+		elif playwright and self.__playwright_contexts:
+			tmp["context_pool"] = (self.__get_pool_key(url), self.__playwright_contexts) # custom attribute, the pooled context is assigned once the request is scheduled
+		tmp["playwright_include_page"    ] = playwright
 		tmp["playwright_context_kwargs"  ] = {}
 		tmp["playwright_context_kwargs"  ]["ignore_https_errors"] = True
 		tmp["playwright_context_kwargs"  ]["java_script_enabled"] = True
 		tmp["playwright_context_kwargs"  ]["accept_downloads"   ] = False
 		tmp["playwright_context_kwargs"  ]["bypass_csp"         ] = False
+		if is_screenshot:
+			tmp["playwright_context_kwargs"  ]["viewport"           ] = self.__screenshot_viewport
+			tmp["playwright_page_init_callback"] = screenshot.INIT_PAGE # marks the page, so its content is not blocked
+		if playwright and self.__playwright_network:
+			tmp["playwright_page_event_handlers"] = {"request": network.capture} # attached before the page navigates
 		tmp["playwright_page_goto_kwargs"] = {"wait_until": "load"}
 		tmp["proxy"                      ] = self.__proxy
 		tmp["cookiejar"                  ] = 1
@@ -158,21 +350,430 @@ class ScrapyScraperSpider(scrapy.Spider):
 		tmp["take_screenshot"            ] = take_screenshot # custom attribute
 		return tmp
 
+	def __get_pool_key(self, url: str):
+		"""
+		Get the key of the browser context pool for a URL, i.e. its domain name if keeping a pool per domain name.
+		"""
+		return urllib.parse.urlsplit(url).netloc.lower() if self.__playwright_contexts_domain else ""
+
+	def __get_pooled_context(self, key: str, contexts: int):
+		"""
+		Get a pooled browser context for a new page.\n
+		Pages are rotated through a fixed number of browser contexts in the pool, and all the contexts in the pool are retired after the specified number of pages each.\n
+		Each time a pool is created, it gets a new epoch, so the name of a closed browser context is never reused, e.g. while Scrapy Playwright is still closing it.\n
+		Returns the pool key, the pool generation, and the context name.
+		"""
+		if key not in self.__pool_epochs:
+			self.__pool_epoch += 1
+			self.__pool_epochs[key] = self.__pool_epoch
+			if self.__job:
+				self.state["pool_epoch"] = self.__pool_epoch # persisted by Scrapy's spider state extension
+		count = self.__context_counts.get(key, 0)
+		self.__context_counts[key] = count + 1
+		generation, slot = divmod(count, contexts)
+		generation //= self.__playwright_context_pages
+		self.__context_generations[key] = generation
+		return key, generation, f"pool.{key}.{self.__pool_epochs[key]}.{slot}.{generation}"
+
+	def __get_capped_pool_key(self, key: str, contexts: int):
+		"""
+		Get the key of the browser context pool to use, so the total number of pooled browser contexts stays capped.\n
+		If there is no room for a new pool, the shared overflow pool is used instead.\n
+		The screenshot pool is never capped.
+		"""
+		if key == screenshot.POOL or key in self.__pool_queued or key in self.__pooled_contexts:
+			return key
+		pools = (self.__pool_queued.keys() | self.__pooled_contexts.keys()) - {screenshot.POOL}
+		if len(pools) < max(1, MAX_POOLED_CONTEXTS // contexts):
+			return key
+		if not self.__overflowed:
+			self.__overflowed = True
+			general.print_yellow(f"Pooled browser contexts are capped at {MAX_POOLED_CONTEXTS}, pages of further domain names share an overflow pool until an idle pool is closed")
+		self.crawler.stats.inc_value("scrapy_scraper/context_overflows")
+		return OVERFLOW_POOL
+
+	def __scheduled(self, request: Request, spider: scrapy.Spider):
+		"""
+		On request scheduled callback.\n
+		Assigns a pooled browser context to a request, and counts the request as queued for the context and its pool.\n
+		Redirects and retries keep the browser context of the original request, so they are not counted again.
+		"""
+		meta = request.meta
+		if "context_pool" in meta and "context_key" not in meta:
+			key, contexts = meta["context_pool"]
+			meta["context_key"], meta["context_generation"], meta["playwright_context"] = self.__get_pooled_context(self.__get_capped_pool_key(key, contexts), contexts) # custom attributes
+			timer = self.__idle_pools.pop(meta["context_key"], None)
+			if timer:
+				timer.cancel()
+			self.__pool_queued[meta["context_key"]] = self.__pool_queued.get(meta["context_key"], 0) + 1
+			self.__context_queued[meta["playwright_context"]] = self.__context_queued.get(meta["playwright_context"], 0) + 1
+
+	def __dropped(self, request: Request, spider: scrapy.Spider):
+		"""
+		On request dropped callback, e.g. a duplicate request.
+		"""
+		if "context_key" in request.meta:
+			self.__release(request.meta)
+			asyncio.ensure_future(self.__close_idle_contexts(request.meta["context_key"]))
+
+	def __release(self, meta: dict[str, typing.Any]):
+		"""
+		Stop counting a request as queued for its pooled browser context and its pool.
+		"""
+		for counts, name in ((self.__pool_queued, meta["context_key"]), (self.__context_queued, meta["playwright_context"])):
+			count = counts.get(name, 0) - 1
+			if count > 0:
+				counts[name] = count
+			else:
+				counts.pop(name, None)
+
+	def __is_retired(self, key: str, generation: int):
+		"""
+		Check if a pooled browser context has been retired.\n
+		A pool not seen in the current run, e.g. of a request restored from the job directory, has not been retired.
+		"""
+		return generation < self.__context_generations.get(key, generation)
+
+	async def __close_idle_contexts(self, key: str):
+		"""
+		Close the retired browser contexts of a pool that have no pages and no queued requests.\n
+		Once a pool has no queued requests, the whole pool is closed after a grace period, unless a new request is queued for it in the meantime.
+		"""
+		contexts = self.__pooled_contexts.get(key, {})
+		for name, (generation, context) in list(contexts.items()):
+			if not context.pages and name not in self.__context_queued and self.__is_retired(key, generation):
+				contexts.pop(name)
+				await context.close()
+		if key not in self.__pool_queued and key not in self.__idle_pools and not self.__closing:
+			self.__idle_pools[key] = asyncio.get_running_loop().call_later(CONTEXT_IDLE_TIMEOUT, lambda: asyncio.ensure_future(self.__close_pool(key)))
+
+	async def __close_pool(self, key: str):
+		"""
+		Close all the browser contexts of an idle pool, and forget the pool, so it does not count towards the cap.\n
+		If requested again, the pool is created anew, under a new epoch.
+		"""
+		self.__idle_pools.pop(key, None)
+		if key in self.__pool_queued:
+			return
+		contexts = self.__pooled_contexts.pop(key, {})
+		for counts in (self.__context_counts, self.__context_generations, self.__pool_epochs):
+			counts.pop(key, None)
+		for _, context in contexts.values():
+			await context.close()
+
+	async def __close_page(self, request: Request):
+		"""
+		Close Playwright's page.\n
+		Its browser context is closed too, unless the context is pooled, in which case only the idle browser contexts of its pool are closed.
+		"""
+		meta = request.meta
+		page: PlaywrightPage | None = meta.get("playwright_page")
+		if "context_key" in meta:
+			if page:
+				self.__pooled_contexts.setdefault(meta["context_key"], {})[meta["playwright_context"]] = (meta["context_generation"], page.context)
+				await page.close()
+			self.__release(meta)
+			await self.__close_idle_contexts(meta["context_key"])
+		elif page:
+			await page.close()
+			await page.context.close()
+
 	# ------------------------------------
 
 	def closed(self, reason: str):
 		"""
-		On close callback.
+		On close callback.\n
+		If streaming, the streamed results are compacted into the output file, unless not compacting.\n
+		If sharded, the streamed results are merged by the runner instead.
+		"""
+		self.__closing = True
+		for timer in self.__idle_pools.values():
+			timer.cancel()
+		if self.__receiver and self.__receiver.running:
+			self.__receiver.stop()
+		if self.__pool:
+			self.__pool.close()
+		if self.__index:
+			self.__index.close()
+		if self.__derive_scope:
+			self.__reclassify()
+		if self.__stream:
+			self.__stream.close()
+		if self.__cache:
+			self.__cache.close()
+		if self.__frontier:
+			self.__frontier.close()
+		if self.__shard:
+			return
+		if self.__stream and self.__no_compact:
+			streamed([self.__stream_out])
+			return
+		if self.__stream:
+			self.__collection = compact([self.__stream_out])
+		save(self.__collection, self.__out)
+
+	def __reclassify(self):
+		"""
+		Reclassify the out-of-scope links to domain names that were whitelisted after the links were collected, i.e. once their start URLs were read.\n
+		If streaming, the links are appended to the stream as in-scope links, which take precedence over out-of-scope links when saving the results.
+		"""
+		if self.__stream:
+			self.__stream.flush()
+			for record in stream.read(self.__stream_out):
+				if record.get("type") == "out_of_scope" and self.__is_link_in_scope(record["url"]):
+					self.__stream.write({"type": "in_scope", "url": record["url"]})
+		else:
+			self.__collection.links.in_scope.extend(link for link in self.__collection.links.out_of_scope if self.__is_link_in_scope(link))
+
+	def __idle(self):
+		"""
+		On spider idle callback.\n
+		If pulling from a frontier, keeps the spider open until the frontier is empty.\n
+		If sharded, keeps the spider open until all the shards are idle and no URLs are in transit.\n
+		If seeding from sitemaps, keeps the spider open until all the parsed sitemaps are exhausted.
+		"""
+		if self.__sitemap_links and self.__feed():
+			raise DontCloseSpider
+		if self.__frontier and not self.__is_drained():
+			raise DontCloseSpider
+		if self.__shard and not self.__shard.set_idle():
+			raise DontCloseSpider
+
+	def __get_request(self, url: str, depth: int):
+		"""
+		Get a request for a URL pulled from a frontier, or routed from another shard.\n
+		URLs with zero depth are start URLs.
+		"""
+		is_start_url = depth == 0
+		meta = self.__get_metadata(url, is_start_url, is_start_url, is_start_url and bool(self.__screenshots))
+		meta["depth"] = depth
+		return self.__revalidate(scrapy.Request(
+			url         = url,
+			headers     = self.__get_headers(),
+			cookies     = self.__cookies,
+			meta        = meta,
+			priority    = self.__get_priority(url, depth) - depth * self.crawler.settings.getint("DEPTH_PRIORITY"), # as if adjusted by Scrapy's depth middleware
+			errback     = self.__error,
+			callback    = self.__success,
+			dont_filter = False
+		))
+
+	def __get_priority(self, url: str, depth: int):
+		"""
+		Get the priority of a request, i.e. the sum of the scores of all the scoring hooks.
+		"""
+		return sum(scorer.score(url, depth) for scorer in self.__scorers)
+
+	def __schedule(self, requests: list[Request]):
+		"""
+		Schedule the requests directly with the engine, so their depth is preserved.\n
+		Returns the number of scheduled requests.
+		"""
+		for request in requests:
+			self.crawler.engine.crawl(request)
+		return len(requests)
+
+	async def __pull(self, count: int, idle: bool):
+		"""
+		Pull at most 'count' requests from the frontier, and schedule them.\n
+		If pulled while idle, and the frontier was empty, it is considered drained.\n
+		If the frontier is unreachable, no requests are pulled.
+		"""
+		entries = []
+		try:
+			entries = await self.__frontier.pop(count)
+		except (OSError, ValueError, sqlite3.Error) as ex:
+			self.__frontier_error(str(ex))
+		self.__pulling = False
+		if self.__closing:
+			return
+		self.__schedule([self.__get_request(url, depth) for url, depth in entries])
+		if self.__pull_again: # URLs were pushed while pulling
+			self.__refill()
+		elif idle and not entries:
+			self.__drained = True
+
+	def __is_drained(self):
+		"""
+		Check if the frontier was empty when last pulled from while idle, with nothing pushed since.\n
+		Otherwise, pulls from the frontier, so the next check can tell.
+		"""
+		if self.__drained:
+			return True
+		elif not self.__pulling:
+			self.__refill(idle = True)
+		return False
+
+	def __frontier_error(self, message: str):
+		"""
+		On frontier error callback.
+		"""
+		self.crawler.stats.inc_value("scrapy_scraper/frontier_errors")
+		self.__print_exception("frontier", message) # the frontier URL may contain a password
+
+	def __get_capacity(self):
+		"""
+		Get the number of concurrent requests minus the number of requests in flight and in the local queue.
+		"""
+		engine = self.crawler.engine
+		return self.crawler.settings.getint("CONCURRENT_REQUESTS") - len(engine.downloader.active) - len(engine.slot.scheduler)
+
+	def __refill(self, idle: bool = False):
+		"""
+		Pull requests from the frontier, up to the number of concurrent requests in flight and in the local queue.\n
+		The pull runs off the reactor thread, and only one pull is in flight at once, if one is, another pull follows it.
+		"""
+		self.__drained = False
+		if self.__pulling:
+			self.__pull_again = True
+			return
+		count = self.__get_capacity()
+		if count > 0:
+			self.__pulling    = True
+			self.__pull_again = False
+			asyncio.ensure_future(self.__pull(count, idle))
+
+	def __receive(self):
+		"""
+		Schedule the URLs routed to the shard, and close the spider once the whole crawl is done.
+		"""
+		self.__schedule([self.__get_request(url, depth) for url, depth in self.__shard.receive(SHARD_POLL_SIZE)])
+		if not self.__closing and self.__shard.is_done():
+			self.__closing = True
+			self.crawler.engine.close_spider(self, "finished")
+
+	def __get_seeding_requests(self, url: str, origins: set[str]):
+		"""
+		Get the requests for 'robots.txt' and the default sitemap of a start URL's host, unless already requested.\n
+		If sharded, only the shard owning the host fetches them.
+		"""
+		tmp    = []
+		obj    = urllib.parse.urlsplit(url)
+		origin = f"{obj.scheme}://{obj.netloc}"
+		if origin not in origins and (not self.__shard or self.__shard.owns(origin)):
+			origins.add(origin)
+			tmp.append(self.__get_sitemap_request(origin + sitemap.ROBOTS, self.__robots))
+			if self.__is_new_sitemap(origin + sitemap.SITEMAP):
+				tmp.append(self.__get_sitemap_request(origin + sitemap.SITEMAP, self.__sitemap))
+		return tmp
+
+	def __get_sitemap_request(self, url: str, callback: typing.Callable):
+		"""
+		Get a request for 'robots.txt' or a sitemap.\n
+		Sitemaps are never fetched with the headless browser, nor cached.\n
+		The request bypasses the duplicate filter, so a resumed job parses the sitemaps again, and the URLs not yet read are not lost, while the URLs already crawled are still filtered out.
+		"""
+		return scrapy.Request(
+			url         = url,
+			headers     = self.__get_headers(),
+			cookies     = self.__cookies,
+			meta        = {"proxy": self.__proxy, "cookiejar": 1, "is_sitemap": True}, # custom attribute
+			errback     = self.__sitemap_error,
+			callback    = callback,
+			dont_filter = True
+		)
+
+	def __robots(self, response: HtmlResponse):
+		"""
+		On 'robots.txt' success callback.
+		"""
+		for link in sitemap.get_robots_sitemaps(response.text if hasattr(response, "text") else response.body.decode("UTF-8", "ignore")):
+			try:
+				link = response.urljoin(link)
+				host = urllib.parse.urlsplit(link).hostname or ""
+			except ValueError: # e.g. an IPv6 address that is not closed
+				continue
+			if self.__is_in_scope(host) and self.__is_new_sitemap(link):
+				yield self.__get_sitemap_request(link, self.__sitemap)
+
+	def __sitemap(self, response: HtmlResponse):
+		"""
+		On sitemap success callback.\n
+		The sitemap is parsed lazily, i.e. only as many URLs as the scheduler can take are parsed at a time.
+		"""
+		self.crawler.stats.inc_value("scrapy_scraper/sitemaps")
+		self.__print_sitemap(response.url)
+		self.__sitemap_links.append(self.__get_sitemap_links(sitemap.parse(response.body)))
+		self.__feed()
+
+	def __get_sitemap_links(self, entries: typing.Iterator[tuple[str, str]]):
+		"""
+		Get the in-scope URLs of a sitemap one by one.\n
+		Nested sitemaps of a sitemap index are scheduled as they are parsed.\n
+		Malformed URLs, e.g. an IPv6 address that is not closed or a port out of range, and URLs that are not absolute HTTP[S] URLs, are skipped.
+		"""
+		for kind, link in entries:
+			try:
+				obj = urllib.parse.urlsplit(link)
+				obj.port # raises on a port out of range
+			except ValueError:
+				continue
+			if obj.scheme.lower() not in ["http", "https"] or not obj.hostname or not self.__is_in_scope(obj.hostname):
+				continue
+			elif kind == "sitemap":
+				if self.__is_new_sitemap(link):
+					self.crawler.engine.crawl(self.__get_sitemap_request(link, self.__sitemap))
+			else:
+				yield link
+
+	def __is_new_sitemap(self, url: str):
+		"""
+		Check if a sitemap has not been requested yet in the current run, and mark it as requested.\n
+		Sitemap requests bypass the duplicate filter, so this also stops a sitemap index that lists itself from looping.
+		"""
+		if url in self.__sitemaps_seen:
+			return False
+		self.__sitemaps_seen.add(url)
+		return True
+
+	def __feed(self):
+		"""
+		Feed the URLs parsed from sitemaps to the scheduler, up to the number of concurrent requests in flight and in the local queue.\n
+		The URLs are routed as if linked from the start URLs, i.e. at the depth of one.\n
+		Returns the number of fed URLs.
+		"""
+		count = self.__get_capacity()
+		links = []
+		while self.__sitemap_links and len(links) < count:
+			link = next(self.__sitemap_links[0], None)
+			if link is None:
+				self.__sitemap_links.popleft()
+			else:
+				links.append(link)
+		links = self.__canonicalize_links(links)
+		if self.__frontier:
+			self.__frontier.push([(link, 1) for link in links])
+			self.__refill()
+		else:
+			for link in links:
+				if self.__shard and not self.__shard.owns(link):
+					self.__shard.send(link, 1)
+				else:
+					self.crawler.engine.crawl(self.__get_request(link, 1))
+		self.crawler.stats.inc_value("scrapy_scraper/sitemap_links", len(links))
+		return len(links)
+
+	async def __sitemap_error(self, failure: Failure):
+		"""
+		On 'robots.txt' or sitemap error callback.\n
+		Missing sitemaps are common, so they are not counted as errors.
+		"""
+		status = failure.value.response.status if failure.check(HttpError) else STATUS_ERROR
+		self.__print_error(status, failure.request.url, str(failure.value).splitlines()[0])
+
+	def __print_sitemap(self, url: str):
+		"""
+		Print sitemap.
+		"""
+		if self.__debug:
+			general.print_cyan(f"[ SITEMAP ] {url}")
+
+	def __is_within_depth(self, depth: int):
+		"""
+		Check if a depth is within the recursion depth limit.
 		"""
-		self.__collection.crawled.sort(key = lambda x: x.url.casefold(), reverse = True)
-		self.__collection.links.in_scope = sorted(array.unique(self.__collection.links.in_scope), key = str.casefold, reverse = True)
-		self.__collection.links.out_of_scope = sorted(array.unique(self.__collection.links.out_of_scope), key = str.casefold, reverse = True)
-		print(f"Total unique URLs crawled: {len(self.__collection.crawled)}")
-		print(f"Total unique in-scope links extracted: {len(self.__collection.links.in_scope)}")
-		print(f"Total unique out-of-scope links extracted: {len(self.__collection.links.out_of_scope)}")
-		stopwatch.stopwatch.stop()
-		if len(self.__collection.crawled) > 0:
-			file.overwrite(general.jdump(dataclasses.asdict(self.__collection)), self.__out)
+		limit = self.crawler.settings.getint("DEPTH_LIMIT")
+		return not limit or depth <= limit
 
 	# ------------------------------------
 
@@ -180,16 +781,20 @@ class ScrapyScraperSpider(scrapy.Spider):
 		"""
 		Error callback.
 		"""
-		request : Request      = failure.request
-		response: HtmlResponse = failure.value.response
-		status = response.status if failure.check(HttpError) else STATUS_ERROR
+		request: Request = failure.request
+		status = failure.value.response.status if failure.check(HttpError) else STATUS_ERROR
 		url    = request.url
 		error  = str(failure.value).splitlines()[0]
-		if self.__playwright:
-			page: PlaywrightPage = request.meta["playwright_page"]
-			await page.close()
-			await page.context.close()
-		self.__print_error(status, url, error)
+		await self.__close_page(request)
+		if failure.check(trap.TemplateLimitReached):
+			self.__print_skip(url, error)
+		else:
+			self.crawler.stats.inc_value("scrapy_scraper/errors")
+			self.__print_error(status, url, error)
+		if self.__sitemap_links:
+			self.__feed()
+		if self.__frontier:
+			self.__refill()
 
 	def __print_error(self, status: int, url: str, message: str):
 		"""
@@ -200,45 +805,197 @@ class ScrapyScraperSpider(scrapy.Spider):
 				url = f"{status} {url}"
 			general.print_red(f"[ ERROR ] {url} -> {message}")
 
+	def __print_skip(self, url: str, message: str):
+		"""
+		Print skip.
+		"""
+		if self.__debug:
+			general.print_yellow(f"[ SKIP ] {url} -> {message}")
+
 	# ------------------------------------
 
 	async def __success(self, response: HtmlResponse):
 		"""
 		Success callback.
 		"""
-		status  = response.status
-		url     = response.url
-		content = ""
-		if self.__playwright:
-			page: PlaywrightPage = response.request.meta["playwright_page"]
-			if self.__playwright_wait > 0:
+		status   = response.status
+		url      = response.url
+		content  = ""
+		encoding = "UTF-8"
+		captured = []
+		page: PlaywrightPage | None = response.meta.get("playwright_page")
+		if page:
+			if self.__playwright_readiness:
+				if not await readiness.wait(page, self.__playwright_readiness, self.__playwright_wait or readiness.TIMEOUT): # if not ready in time, the page is used as is
+					self.crawler.stats.inc_value("scrapy_scraper/readiness_timeouts")
+			elif self.__playwright_wait > 0:
 				await asyncio.sleep(self.__playwright_wait)
 			content = await page.content()
+			captured = network.pop(page)
+			if self.__max_html:
+				content = content[:self.__max_html] # in characters, not bytes
 			if self.__screenshots and response.meta.get("take_screenshot", False):
 				await self.__screenshot(url, page)
-			await page.close()
-			await page.context.close()
+			await self.__close_page(response.request)
+		else:
+			content  = response.body
+			encoding = getattr(response, "encoding", encoding) # only text responses have an encoding
+		entry = self.__get_cached(response) if status == 304 else None
+		if entry:
+			status, in_scope_links, out_of_scope_links = entry.status, entry.in_scope, entry.out_of_scope
+			self.crawler.stats.inc_value("scrapy_scraper/cached")
 		else:
-			content = response.body
-		if self.__downloads:
-			self.__download(url, content)
-		in_scope_links, out_of_scope_links = self.__extract_links(url, HtmlResponse(url = url, body = content, encoding = "UTF-8") if self.__playwright else response)
-		self.__collection.crawled.append(Crawled(url, status, response.meta.get("is_start_url", False)))
-		self.__collection.links.in_scope.extend(in_scope_links)
-		self.__collection.links.out_of_scope.extend(out_of_scope_links)
+			in_scope_links, out_of_scope_links, tags = self.__extract_links(url, content, encoding, not page and size.is_javascript(url, response.headers))
+			if captured:
+				in_scope_links, out_of_scope_links = self.__add_captured_links(url, captured, in_scope_links, out_of_scope_links)
+			if not page and self.__needs_rendering(response, tags):
+				self.__render(response)
+				return
+			stopped = "download_stopped" in response.flags # truncated or dropped by the size limits
+			if self.__downloads:
+				await self.__download(url, content, stopped)
+			if not page and not stopped:
+				self.__cache_links(response, in_scope_links, out_of_scope_links)
+		self.__collect(Crawled(url, status, response.meta.get("is_start_url", False)), in_scope_links, out_of_scope_links)
+		self.crawler.stats.inc_value("scrapy_scraper/crawled")
 		self.__print_success(status, url)
 		# --------------------------------
-		if self.__crawl:
+		if self.__sitemap_links:
+			self.__feed()
+		depth = response.meta.get("depth", 0) + 1
+		in_scope_links = self.__canonicalize_links(in_scope_links)
+		if self.__frontier:
+			if self.__crawl and self.__is_within_depth(depth):
+				self.__frontier.push([(link, depth) for link in in_scope_links])
+			self.__refill()
+		elif self.__crawl:
 			for link in in_scope_links:
-				yield response.follow(
+				if self.__shard and not self.__shard.owns(link):
+					if self.__is_within_depth(depth):
+						self.__shard.send(link, depth)
+					continue
+				yield self.__revalidate(response.follow(
 					url         = link,
 					headers     = self.__get_headers(),
 					cookies     = self.__cookies,
-					meta        = self.__get_metadata(False, False),
+					meta        = self.__get_metadata(link, False, False),
+					priority    = self.__get_priority(link, depth),
 					errback     = self.__error,
 					callback    = self.__success,
 					dont_filter = False
-				)
+				))
+
+	def __canonicalize_links(self, links: list[str]):
+		"""
+		If canonicalizing, canonicalize links, and remove the resulting duplicates.\n
+		Collected links are kept as extracted, only the links to crawl are canonicalized.
+		"""
+		return array.unique([urlutil.canonicalize(link) for link in links]) if self.__canonicalize else links
+
+	def __get_fingerprint(self, request: Request):
+		"""
+		Get Scrapy's request fingerprint.
+		"""
+		return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+	def __revalidate(self, request: Request):
+		"""
+		If caching, make a request conditional on its cached validators, if any.\n
+		Requests fetched with the headless browser are never cached.
+		"""
+		if self.__cache and not request.meta.get("playwright"):
+			request.meta["handle_httpstatus_list"] = [304]
+			entry = self.__cache.get(self.__get_fingerprint(request))
+			if entry:
+				if entry.etag:
+					request.headers["If-None-Match"] = entry.etag
+				if entry.last_modified:
+					request.headers["If-Modified-Since"] = entry.last_modified
+		return request
+
+	def __get_cached(self, response: HtmlResponse):
+		"""
+		Get the cached entry of a response that has not been modified since it was cached.\n
+		Returns 'None' if not caching, or if there is no entry.
+		"""
+		return self.__cache.get(self.__get_fingerprint(response.request)) if self.__cache else None
+
+	def __cache_links(self, response: HtmlResponse, in_scope_links: list[str], out_of_scope_links: list[str]):
+		"""
+		If caching, cache the validators and the extracted links of a successful response.\n
+		Responses without validators cannot be revalidated, so they are not cached.
+		"""
+		if self.__cache and response.status == 200:
+			etag          = response.headers.get("ETag", b"").decode("ISO-8859-1")
+			last_modified = response.headers.get("Last-Modified", b"").decode("ISO-8859-1")
+			if etag or last_modified:
+				self.__cache.put(self.__get_fingerprint(response.request), response.url, cache.Entry(etag, last_modified, response.status, in_scope_links, out_of_scope_links))
+
+	def __needs_rendering(self, response: HtmlResponse, tags: dict[str, int]):
+		"""
+		In the hybrid mode, check if an HTML page fetched without the headless browser needs JavaScript rendering.\n
+		A page needs rendering if it has fewer anchors than external scripts, e.g. a single-page application shell, or a 'noscript' fallback and hardly any anchors.\n
+		A 'noscript' fallback alone is not enough, as tracking snippets, e.g. Google Tag Manager's, put one on most pages.\n
+		Non-HTML content, e.g. JavaScript files and other static assets, never needs rendering.
+		"""
+		return (
+			self.__playwright_hybrid
+			and b"html" in response.headers.get("Content-Type", b"").lower()
+			and (tags.get("a", 0) < tags.get("script", 0) or (tags.get("noscript", 0) > 0 and tags.get("a", 0) < RENDER_MIN_ANCHORS))
+		)
+
+	def __render(self, response: HtmlResponse):
+		"""
+		Fetch a page again, but this time with the headless browser.\n
+		The request is scheduled directly with the engine, so the depth of the page is preserved.
+		"""
+		meta = self.__get_metadata(response.url, response.meta.get("is_start_url", False), response.meta.get("take_screenshot", False), True)
+		meta["depth"] = response.meta.get("depth", 0)
+		self.crawler.engine.crawl(response.request.replace(url = response.url, meta = meta, dont_filter = True))
+		self.crawler.stats.inc_value("scrapy_scraper/rendered")
+		self.__print_render(response.url)
+
+	def __print_render(self, url: str):
+		"""
+		Print render.
+		"""
+		if self.__debug:
+			general.print_yellow(f"[ RENDER ] {url}")
+
+	def __collect(self, crawled: Crawled, in_scope_links: list[str], out_of_scope_links: list[str]):
+		"""
+		Collect a crawled URL and its extracted links.\n
+		If streaming, the crawled URL and only the links not seen recently are written to the stream instead.\n
+		If using a Bloom filter, only the newly seen links are collected either way.
+		"""
+		if self.__stream:
+			self.__stream.write({"type": "crawled", **dataclasses.asdict(crawled)})
+			for kind, links in (("in_scope", in_scope_links), ("out_of_scope", out_of_scope_links)):
+				for link in links:
+					if not self.__is_seen(link):
+						self.__stream.write({"type": kind, "url": link})
+		elif self.__bloom_filter:
+			self.__collection.crawled.append(crawled)
+			self.__collection.links.in_scope.extend(link for link in in_scope_links if not self.__is_seen(link))
+			self.__collection.links.out_of_scope.extend(link for link in out_of_scope_links if not self.__is_seen(link))
+		else:
+			self.__collection.crawled.append(crawled)
+			self.__collection.links.in_scope.extend(in_scope_links)
+			self.__collection.links.out_of_scope.extend(out_of_scope_links)
+		if self.__bloom_filter:
+			self.crawler.stats.set_value("scrapy_scraper/links_bloom_bytes", self.__seen.get_bytes())
+
+	def __is_seen(self, link: str):
+		"""
+		Check if a link has been seen before, and mark it as seen.\n
+		If streaming without a Bloom filter, only the recently seen links are remembered.
+		"""
+		if self.__bloom_filter or self.__stream:
+			return self.__seen.add(link)
+		elif link in self.__seen:
+			return True
+		self.__seen.add(link)
+		return False
 
 	def __print_success(self, status: int, url: str):
 		"""
@@ -249,29 +1006,65 @@ class ScrapyScraperSpider(scrapy.Spider):
 
 	# ------------------------------------
 
-	async def __screenshot(self, url: str, page: PlaywrightPage):
+	async def __screenshot(self, url: str, page: "PlaywrightPage"):
 		"""
-		Take a screenshot.
+		Take a screenshot.\n
+		Only the capture runs on the page, and at most as many captures as there are screenshot workers run at once.\n
+		The screenshot is encoded and written by the worker pool, so the page can be closed right away, and the reactor is not blocked.
 		"""
-		filename = os.path.join(self.__screenshots, self.__get_url_filename(url)) + ".png"
-		if not os.path.exists(filename):
+		from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+		filename = os.path.join(self.__screenshots, self.__get_url_filename(url)) + f".{self.__screenshot_format}"
+		if filename not in self.__pending and not os.path.exists(filename):
+			self.__pending.add(filename)
+			content = b""
 			try:
-				await page.screenshot(path = filename, full_page = False)
+				async with self.__screenshot_slots:
+					if self.__screenshot_format == "jpeg":
+						content = await page.screenshot(type = "jpeg", quality = self.__screenshot_quality, full_page = False)
+					else:
+						content = await page.screenshot(type = "png", full_page = False) # lossless, if encoding to WebP
 			except (PlaywrightError, PlaywrightTimeoutError) as ex:
 				self.__print_exception(url, str(ex))
+			if content:
+				await self.__pool.submit(lambda message: self.__downloaded(url, filename, message), screenshot.save, content, filename, self.__screenshot_format, self.__screenshot_quality, self.__screenshot_thumbnail)
+			else:
+				self.__pending.discard(filename)
 
-	def __download(self, url: str, content: str | bytes):
+	async def __download(self, url: str, content: str | bytes, truncated: bool = False):
 		"""
-		Download a JavaScript file.
+		Download a JavaScript file.\n
+		The file is beautified and written by the worker pool, so the reactor is not blocked.\n
+		If storing by hash, the same content is beautified and written only once, regardless of the number of URLs serving it.\n
+		Large files are spooled to disk first, so the pending tasks hold only filenames, not contents.\n
+		If truncated by the size limits, the part received is written to a file ending with '.truncated.js'.
 		"""
 		if url.lower().endswith(".js"):
-			filename = os.path.join(self.__downloads, self.__get_url_filename(url))
-			if not os.path.exists(filename):
-				try:
-					soup = BeautifulSoup(content, "html.parser")
-					open(filename, "w").write(jsbeautifier.beautify(soup.get_text()))
-				except Exception as ex:
-					self.__print_exception(url, str(ex))
+			filename = ""
+			if self.__download_hash:
+				digest   = hashlib.sha256(content.encode("UTF-8") if isinstance(content, str) else content).hexdigest()
+				filename = os.path.join(self.__downloads, f"{digest}.js")
+				self.__index.write({"url": url, "sha256": digest, "truncated": truncated})
+			else:
+				filename = os.path.join(self.__downloads, self.__get_url_filename(url))
+			if truncated:
+				filename = f"{filename.removesuffix('.js')}.truncated.js"
+				self.crawler.stats.inc_value("scrapy_scraper/downloads_truncated")
+			if filename not in self.__pending and not os.path.exists(filename):
+				self.__pending.add(filename)
+				if len(content) > DOWNLOAD_SPOOL_SIZE:
+					spool = f"{filename}.part"
+					await asyncio.to_thread(download.spool, content, spool)
+					await self.__pool.submit(lambda message: self.__downloaded(url, filename, message), download.beautify_file, spool, filename)
+				else:
+					await self.__pool.submit(lambda message: self.__downloaded(url, filename, message), download.beautify, content, filename)
+
+	def __downloaded(self, url: str, filename: str, message: str):
+		"""
+		On download or screenshot done callback.
+		"""
+		self.__pending.discard(filename)
+		if message:
+			self.__print_exception(url, message)
 
 	def __get_url_filename(self, url: str):
 		"""
@@ -286,51 +1079,48 @@ class ScrapyScraperSpider(scrapy.Spider):
 
 	# ------------------------------------
 
-	def __extract_links(self, url: str, response: HtmlResponse):
+	def __extract_links(self, url: str, content: str | bytes, encoding: str, javascript: bool):
 		"""
 		Extract links.\n
-		Returns a unique list.
+		If using the extended extraction, endpoints are extracted from JavaScript files, and more links from HTML pages.\n
+		Returns two unique lists, i.e. in-scope and out-of-scope links, and the number of occurrences of each tag of interest.
 		"""
 		in_scope = []
 		out_of_scope = []
-		for tag, attr in (("script", "src"),("a", "href"),("link", "href")):
-			try:
-				tmp1, tmp2 = self.__extract_links_xpath(url, response, tag, attr)
-				in_scope.extend(tmp1)
-				out_of_scope.extend(tmp2)
-			except (UnicodeEncodeError, AttributeError) as ex:
-				self.__print_exception(url, str(ex))
-		return array.unique(in_scope), array.unique(out_of_scope)
+		tags = {}
+		try:
+			if javascript and self.__extended_extraction:
+				in_scope, out_of_scope, tags = extract.scripts(url, content, self.__is_in_scope)
+			else:
+				in_scope, out_of_scope, tags = extract.links(url, content, encoding, self.__is_in_scope, self.__extended_extraction)
+		except (lxml.etree.LxmlError, ValueError) as ex:
+			self.__print_exception(url, str(ex))
+		return in_scope, out_of_scope, tags
 
-	def __extract_links_xpath(self, url: str, response: HtmlResponse, tag: str, attr: str):
+	def __add_captured_links(self, url: str, captured: list[str], in_scope_links: list[str], out_of_scope_links: list[str]):
 		"""
-		Extract links based on the specified XPath.
+		Classify the URLs captured from the network traffic of a page, and add them to the extracted links.\n
+		The page's own URL is skipped.\n
+		Returns two unique lists, i.e. in-scope and out-of-scope links.
 		"""
-		in_scope = []
-		out_of_scope = []
-		for link in response.xpath(f"//{tag}[@{attr}]"):
-			link = link.xpath(f"@{attr}").get()
-			if not link:
-				continue
-			obj = urllib.parse.urlsplit(link)
-			if obj.scheme and obj.scheme.lower() not in ["http", "https"]:
-				continue
-			if not obj.scheme and not obj.netloc:
-				in_scope.append(urllib.parse.urljoin(url, link))
-				continue
-			if obj.scheme and obj.netloc:
-				if self.__is_in_scope(obj.netloc):
-					in_scope.append(link)
-				else:
-					out_of_scope.append(link)
-		return array.unique(in_scope), array.unique(out_of_scope)
+		in_scope, out_of_scope = extract.urls(url, [link for link in captured if link != url], self.__is_in_scope)
+		self.crawler.stats.inc_value("scrapy_scraper/captured", len(in_scope) + len(out_of_scope))
+		return array.unique(in_scope_links + in_scope), array.unique(out_of_scope_links + out_of_scope)
 
 	def __is_in_scope(self, domain: str):
 		"""
 		Check if a domain name is in the scope.
 		"""
-		domain = domain.lower()
-		return not self.allowed_domains or any(domain == allowed or domain.endswith(f".{allowed}") for allowed in self.allowed_domains)
+		return self.scope.is_in_scope(domain)
+
+	def __is_link_in_scope(self, link: str):
+		"""
+		Check if a link's domain name is in the scope.
+		"""
+		try:
+			return self.__is_in_scope(urllib.parse.urlsplit(link).netloc)
+		except ValueError:
+			return False
 
 	# ------------------------------------
 
@@ -343,29 +1133,109 @@ class ScrapyScraperSpider(scrapy.Spider):
 
 # ----------------------------------------
 
+def compact(files: list[str]):
+	"""
+	Read the streamed results back into a collection.\n
+	Crawled URLs are deduplicated, e.g. in case a stream was appended to by a previous run.\n
+	Missing files are skipped.
+	"""
+	collection = Collection()
+	crawled    = {}
+	for out in files:
+		if not os.path.isfile(out):
+			continue
+		for record in stream.read(out):
+			kind = record.get("type")
+			if kind == "crawled":
+				crawled[record["url"]] = Crawled(record["url"], record["status"], record["is_start_url"])
+			elif kind == "in_scope":
+				collection.links.in_scope.append(record["url"])
+			elif kind == "out_of_scope":
+				collection.links.out_of_scope.append(record["url"])
+	collection.crawled = list(crawled.values())
+	return collection
+
+def save(collection: Collection, out: str):
+	"""
+	Sort and deduplicate the results, print the totals, and save the results to the output file.\n
+	Links that are both in the scope and out of the scope, e.g. reclassified once their domain names were whitelisted, are kept as in-scope links only.
+	"""
+	collection.crawled.sort(key = lambda x: x.url.casefold(), reverse = True)
+	collection.links.in_scope = sorted(array.unique(collection.links.in_scope), key = str.casefold, reverse = True)
+	in_scope = set(collection.links.in_scope)
+	collection.links.out_of_scope = sorted(array.unique([link for link in collection.links.out_of_scope if link not in in_scope]), key = str.casefold, reverse = True)
+	print(f"Total unique URLs crawled: {len(collection.crawled)}")
+	print(f"Total unique in-scope links extracted: {len(collection.links.in_scope)}")
+	print(f"Total unique out-of-scope links extracted: {len(collection.links.out_of_scope)}")
+	stopwatch.stopwatch.stop()
+	if len(collection.crawled) > 0:
+		file.overwrite(general.jdump(dataclasses.asdict(collection)), out)
+
+def streamed(files: list[str]):
+	"""
+	Print where the streamed results are, instead of compacting them into the output file.
+	"""
+	stopwatch.stopwatch.stop()
+	for out in files:
+		if os.path.isfile(out):
+			print(f"Results have been streamed to '{out}'")
+
+# ----------------------------------------
+
 class ScrapyScraper:
 
 	def __init__(
 		self,
-		urls                      : list[str],
-		whitelist                 : list[str],
+		urls                      : seed.Seeds,
+		whitelist                 : list[str] | None,
 		playwright                : bool,
+		playwright_hybrid         : bool,
 		playwright_wait           : float,
+		playwright_contexts       : int,
+		playwright_context_pages  : int,
+		playwright_contexts_domain: bool,
+		playwright_network        : bool,
+		playwright_readiness      : str,
 		concurrent_requests       : int,
 		concurrent_requests_domain: int,
+		shards                    : int,
 		sleep                     : float,
 		random_sleep              : bool,
 		auto_throttle             : float,
+		adaptive_concurrency      : bool,
 		retries                   : int,
 		recursion                 : int,
+		scheduling_policy         : str,
+		scoring                   : list[str],
+		canonicalize              : bool,
+		template_limit            : int,
+		sitemaps                  : bool,
+		max_html                  : int,
+		max_js                    : int,
+		extended_extraction       : bool,
 		request_timeout           : float,
 		headers                   : dict[str, str],
 		cookies                   : dict[str, str],
 		user_agents               : list[str],
 		proxy                     : str,
 		downloads                 : str,
+		download_hash             : bool,
 		screenshots               : str,
+		screenshot_viewport       : dict[str, int],
+		screenshot_format         : str,
+		screenshot_quality        : int,
+		screenshot_thumbnail      : int,
+		screenshot_workers        : int,
 		out                       : str,
+		stream_out                : str,
+		no_compact                : bool,
+		bloom_filter              : float,
+		job                       : str,
+		cache                     : str,
+		frontier                  : str,
+		metrics                   : str,
+		metrics_interval          : float,
+		metrics_port              : int,
 		debug                     : bool
 	):
 		"""
@@ -374,38 +1244,118 @@ class ScrapyScraper:
 		self.__urls                       = urls
 		self.__whitelist                  = whitelist
 		self.__playwright                 = playwright
+		self.__playwright_hybrid          = playwright_hybrid
 		self.__playwright_wait            = playwright_wait
+		self.__playwright_contexts        = playwright_contexts
+		self.__playwright_context_pages   = playwright_context_pages
+		self.__playwright_contexts_domain = playwright_contexts_domain
+		self.__playwright_network         = playwright_network
+		self.__playwright_readiness       = playwright_readiness
 		self.__concurrent_requests        = concurrent_requests
 		self.__concurrent_requests_domain = concurrent_requests_domain
+		self.__shards                     = shards
 		self.__sleep                      = sleep
 		self.__random_sleep               = random_sleep
 		self.__auto_throttle              = auto_throttle
+		self.__adaptive_concurrency       = adaptive_concurrency
 		self.__retries                    = retries
 		self.__recursion                  = recursion
+		self.__scheduling_policy          = scheduling_policy
+		self.__scoring                    = scoring
+		self.__canonicalize               = canonicalize
+		self.__template_limit             = template_limit
+		self.__sitemaps                   = sitemaps
+		self.__max_html                   = max_html
+		self.__max_js                     = max_js
+		self.__extended_extraction        = extended_extraction
 		self.__request_timeout            = request_timeout # all timeouts
 		self.__headers                    = headers
 		self.__cookies                    = cookies
 		self.__user_agents                = user_agents
 		self.__proxy                      = proxy
 		self.__downloads                  = downloads
+		self.__download_hash              = download_hash
 		self.__screenshots                = screenshots
+		self.__screenshot_viewport        = screenshot_viewport
+		self.__screenshot_format          = screenshot_format
+		self.__screenshot_quality         = screenshot_quality
+		self.__screenshot_thumbnail       = screenshot_thumbnail
+		self.__screenshot_workers         = screenshot_workers
 		self.__out                        = out
+		self.__stream_out                 = stream_out if stream_out or not job else os.path.join(job, JOB_STREAM) # a job always streams its results
+		self.__no_compact                 = no_compact
+		self.__bloom_filter               = bloom_filter
+		self.__job                        = job
+		self.__cache                      = cache
+		self.__frontier                   = frontier
+		self.__metrics                    = metrics
+		self.__metrics_interval           = metrics_interval
+		self.__metrics_port               = metrics_port
 		self.__debug                      = debug
 		self.__headless_browser           = True
 		self.__browser_type               = "chromium" # Playwright's headless browser
 		self.__handle_sigint              = False
 		self.__max_redirects              = 10
 
-	def __page_block(self, request: PlaywrightRequest):
+	def __page_block(self, request: "PlaywrightRequest"):
 		"""
 		Types of content to block while using Playwright's headless browser.\n
-		Skipped if taking screenshots.
+		Skipped for pages taking screenshots.
 		"""
-		return request.resource_type in ["fetch", "stylesheet", "image", "ping", "font", "media", "imageset", "beacon", "csp_report", "object", "texttrack", "manifest"]
+		return request.resource_type in ["fetch", "stylesheet", "image", "ping", "font", "media", "imageset", "beacon", "csp_report", "object", "texttrack", "manifest"] and not screenshot.is_screenshot_request(request)
 
 	def run(self):
 		"""
-		Configure the settings and run the Chad Extractor spider.
+		Run the Chad Extractor spider.\n
+		If sharded, the spider is run in worker processes, one for each shard.
+		"""
+		if self.__shards > 1:
+			self.__run_shards()
+		else:
+			self.crawl()
+
+	def __get_shard_stream(self):
+		"""
+		Get the base of the per-shard stream files.\n
+		Shards always stream their results, to the output file's streams if not streaming otherwise.
+		"""
+		return self.__stream_out or self.__out
+
+	def __run_shards(self):
+		"""
+		Run the spider in worker processes, one for each shard, and merge the shards' streamed results into the output file.\n
+		The shards' streams are kept only if streaming.
+		"""
+		shards  = shard.create(self.__shards)
+		streams = [obj.suffix(self.__get_shard_stream()) for obj in shards]
+		if not self.__stream_out:
+			for out in streams:
+				if os.path.isfile(out):
+					os.remove(out)
+		processes = [multiprocessing.get_context("spawn").Process(target = self.crawl, args = (obj,)) for obj in shards]
+		for process in processes:
+			process.start()
+		for process in processes:
+			while True:
+				try:
+					process.join()
+					break
+				except KeyboardInterrupt: # the worker processes get the signal too, and close gracefully
+					pass
+		if self.__stream_out and self.__no_compact:
+			streamed(streams)
+			return
+		collection = compact(streams)
+		if not self.__stream_out:
+			for out in streams:
+				if os.path.isfile(out):
+					os.remove(out)
+		save(collection, self.__out)
+
+	def crawl(self, shard: shard.Shard | None = None):
+		"""
+		Configure the settings and run the Chad Extractor spider in the current process.\n
+		If a shard is specified, the spider crawls only the shard's partition, and the concurrent requests are split between the shards.
 		"""
 		settings = scrapy.utils.project.get_project_settings()
 		# --------------------------------
@@ -417,13 +1367,29 @@ class ScrapyScraper:
 		# --------------------------------
 		settings["EXTENSIONS"]["scrapy.extensions.throttle.AutoThrottle"] = 100
 		# --------------------------------
+		settings["DOWNLOADER_MIDDLEWARES"]["scrapy.downloadermiddlewares.offsite.OffsiteMiddleware"] = None
+		settings["DOWNLOADER_MIDDLEWARES"]["scrapy_scraper.utils.scope.OffsiteMiddleware"         ] = 50
+		# --------------------------------
 		settings["AUTOTHROTTLE_ENABLED"           ] = self.__auto_throttle > 0
 		settings["AUTOTHROTTLE_DEBUG"             ] = False
 		settings["AUTOTHROTTLE_START_DELAY"       ] = self.__sleep
 		settings["AUTOTHROTTLE_MAX_DELAY"         ] = self.__sleep + 30
 		settings["AUTOTHROTTLE_TARGET_CONCURRENCY"] = self.__auto_throttle
 		# --------------------------------
-		settings["CONCURRENT_REQUESTS"           ] = self.__concurrent_requests
+		if self.__template_limit:
+			settings["DOWNLOADER_MIDDLEWARES"]["scrapy_scraper.utils.trap.TemplateLimit"] = 60 # drops the requests after the offsite middleware, before the rest
+			settings["TEMPLATE_LIMIT"] = self.__template_limit # custom setting
+		# --------------------------------
+		if self.__max_html or self.__max_js:
+			settings["EXTENSIONS"]["scrapy_scraper.utils.size.SizeLimits"] = 200
+			settings["MAX_HTML_SIZE"] = self.__max_html # custom setting
+			settings["MAX_JS_SIZE"  ] = self.__max_js # custom setting
+		# --------------------------------
+		if self.__adaptive_concurrency:
+			settings["DOWNLOADER_MIDDLEWARES"]["scrapy_scraper.utils.throttle.AdaptiveConcurrency"] = 600 # sees the responses and the exceptions before the retry middleware
+			settings["ADAPTIVE_CONCURRENCY"] = True # custom setting
+		# --------------------------------
+		settings["CONCURRENT_REQUESTS"           ] = max(1, self.__concurrent_requests // shard.count) if shard else self.__concurrent_requests
 		settings["CONCURRENT_REQUESTS_PER_DOMAIN"] = self.__concurrent_requests_domain
 		settings["RETRY_ENABLED"                 ] = self.__retries > 0
 		settings["RETRY_TIMES"                   ] = self.__retries
@@ -431,15 +1397,35 @@ class ScrapyScraper:
 		settings["REDIRECT_MAX_TIMES"            ] = self.__max_redirects
 		settings["DEPTH_LIMIT"                   ] = self.__recursion if self.__recursion > NO_RECURSION else 1
 		# --------------------------------
+		if self.__scheduling_policy in ["breadth", "host"]:
+			settings["DEPTH_PRIORITY"        ] = 1
+			settings["SCHEDULER_DISK_QUEUE"  ] = "scrapy.squeues.PickleFifoDiskQueue"
+			settings["SCHEDULER_MEMORY_QUEUE"] = "scrapy.squeues.FifoMemoryQueue"
+		if self.__scheduling_policy == "host":
+			settings["SCHEDULER_PRIORITY_QUEUE"] = "scrapy.pqueues.DownloaderAwarePriorityQueue" # prefers the hosts with the fewest requests in flight
+		# --------------------------------
 		settings["ROBOTSTXT_OBEY"                      ] = False
 		settings["TELNETCONSOLE_ENABLED"               ] = False
 		settings["LOG_ENABLED"                         ] = False
 		settings["REQUEST_FINGERPRINTER_IMPLEMENTATION"] = "2.7"
+		settings["TWISTED_REACTOR"                     ] = "twisted.internet.asyncioreactor.AsyncioSelectorReactor" # required by Playwright and the download pool
+		# --------------------------------
+		if self.__metrics or self.__metrics_port:
+			settings["EXTENSIONS"]["scrapy_scraper.utils.metrics.Metrics"] = 500
+			settings["METRICS_FILE"    ] = shard.suffix(self.__metrics) if shard else self.__metrics # custom setting
+			settings["METRICS_INTERVAL"] = self.__metrics_interval # custom setting
+			settings["METRICS_PORT"    ] = self.__metrics_port + shard.index if shard and self.__metrics_port else self.__metrics_port # custom setting
+		# --------------------------------
+		if self.__bloom_filter:
+			settings["DUPEFILTER_CLASS"       ] = "scrapy_scraper.utils.dedup.BloomDupeFilter"
+			settings["BLOOM_FILTER_ERROR_RATE"] = self.__bloom_filter # custom setting
+		# --------------------------------
+		if self.__job:
+			settings["JOBDIR"] = self.__job # persist the request queue, the seen requests, and the spider's state
 		# --------------------------------
-		if self.__playwright:
+		if self.__playwright or self.__playwright_hybrid:
 			settings["DOWNLOAD_HANDLERS"]["https"] = "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler"
 			settings["DOWNLOAD_HANDLERS"]["http" ] = "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler"
-			settings["TWISTED_REACTOR"           ] = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 			settings["PLAYWRIGHT_LAUNCH_OPTIONS" ] = {
 				"headless"     : self.__headless_browser,
 				"handle_sigint": self.__handle_sigint,
@@ -447,9 +1433,9 @@ class ScrapyScraper:
 			}
 			settings["PLAYWRIGHT_BROWSER_TYPE"              ] = self.__browser_type
 			settings["PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT"] = self.__request_timeout * 1000
-			settings["PLAYWRIGHT_ABORT_REQUEST"             ] = None if self.__screenshots else self.__page_block
+			settings["PLAYWRIGHT_ABORT_REQUEST"             ] = self.__page_block
 		# --------------------------------
 		scrapy_scraper_spider = scrapy.crawler.CrawlerProcess(settings)
-		scrapy_scraper_spider.crawl(ScrapyScraperSpider, self.__urls, self.__whitelist, self.__playwright, self.__playwright_wait, self.__recursion, self.__headers, self.__cookies, self.__user_agents, self.__proxy, self.__downloads, self.__screenshots, self.__out, self.__debug)
+		scrapy_scraper_spider.crawl(ScrapyScraperSpider, self.__urls, self.__whitelist, self.__playwright, self.__playwright_hybrid, self.__playwright_wait, self.__playwright_contexts, self.__playwright_context_pages, self.__playwright_contexts_domain, self.__playwright_network, self.__playwright_readiness, self.__recursion, self.__scoring, self.__canonicalize, self.__sitemaps, self.__max_html, self.__extended_extraction, self.__headers, self.__cookies, self.__user_agents, self.__proxy, self.__downloads, self.__download_hash, self.__screenshots, self.__screenshot_viewport, self.__screenshot_format, self.__screenshot_quality, self.__screenshot_thumbnail, self.__screenshot_workers, self.__out, shard.suffix(self.__get_shard_stream()) if shard else self.__stream_out, self.__no_compact, self.__bloom_filter, self.__job, cache.Cache(self.__cache) if self.__cache else None, self.__frontier, shard, self.__debug)
 		scrapy_scraper_spider.start()
 		scrapy_scraper_spider.join()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import importlib.util, io, os, typing, weakref
+
+if typing.TYPE_CHECKING:
+	from playwright.async_api import Request as PlaywrightRequest, Page as PlaywrightPage
+
+FORMATS   = ["png", "jpeg", "webp"]
+POOL      = "#screenshots" # cannot clash with a domain name
+INIT_PAGE = f"{__name__}.init_page"
+PAGES     = weakref.WeakSet() # pages taking screenshots, in the current process
+
+async def init_page(page: "PlaywrightPage", request: typing.Any):
+	"""
+	Scrapy Playwright's page init callback.\n
+	Marks a page as taking a screenshot before it navigates, so its images, fonts, and other content are not blocked.
+	"""
+	PAGES.add(page)
+
+def is_screenshot_request(request: "PlaywrightRequest"):
+	"""
+	Check if a request of Playwright's headless browser belongs to a page taking a screenshot.
+	"""
+	from playwright.async_api import Error as PlaywrightError
+	try:
+		return request.frame.page in PAGES
+	except PlaywrightError: # e.g. a service worker's request has no frame
+		return False
+
+def needs_pillow(format: str, thumbnail: int):
+	"""
+	Check if Pillow is required, i.e. if encoding to WebP, or generating thumbnails.\n
+	Playwright's headless browser can only encode to PNG and JPEG.
+	"""
+	return format == "webp" or thumbnail > 0
+
+def has_pillow():
+	"""
+	Check if Pillow, an optional dependency, is installed.
+	"""
+	return importlib.util.find_spec("PIL") is not None
+
+def get_thumbnail_filename(filename: str):
+	"""
+	Get the thumbnail filename of a screenshot, e.g. 'example.com.thumbnail.png'.
+	"""
+	root, extension = os.path.splitext(filename)
+	return f"{root}.thumbnail{extension}"
+
+def save(content: bytes, filename: str, format: str, quality: int, thumbnail: int):
+	"""
+	Encode a screenshot captured as PNG or JPEG to the specified format, generate its thumbnail, and write both to the output files.\n
+	Meant to be run in a worker process.\n
+	Returns an empty string on success, or an error message on failure.
+	"""
+	message = ""
+	try:
+		if needs_pillow(format, thumbnail):
+			from PIL import Image # optional dependency
+			image   = Image.open(io.BytesIO(content))
+			options = {"quality": quality} if format != "png" else {}
+			if format == "webp":
+				image.save(filename, "WEBP", **options)
+			else:
+				open(filename, "wb").write(content)
+			if thumbnail:
+				image.thumbnail((thumbnail, image.height)) # keeps the aspect ratio, never upscales
+				image.convert("RGB" if format == "jpeg" else image.mode).save(get_thumbnail_filename(filename), format.upper(), **options)
+		else:
+			open(filename, "wb").write(content)
+	except Exception as ex:
+		message = str(ex)
+	return message
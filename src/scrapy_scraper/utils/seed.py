@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+from . import file, url
+
+import collections, typing
+
+DEDUP_WINDOW = 100000
+
+class Seeds:
+
+	def __init__(self, source: str, dedup_window: int = DEDUP_WINDOW):
+		"""
+		Class for reading start URLs lazily, either from a file or a single URL.\n
+		Lines are validated and deduplicated as they are read, so the first request can be sent before the whole file is read.\n
+		Duplicates are tracked only within a window of the most recently read URLs, so memory stays bounded regardless of the file size, and duplicates beyond the window are dropped by Scrapy's duplicate filter.
+		"""
+		self.source         = source
+		self.is_file        = file.is_file(source)
+		self.__dedup_window = dedup_window
+
+	def read(self) -> typing.Iterator[tuple[str, str]]:
+		"""
+		Read the start URLs one by one.\n
+		Yields a URL and an error message, which is empty if the URL is valid.
+		"""
+		if not self.is_file:
+			yield self.source, ""
+			return
+		recent = collections.OrderedDict()
+		for line in file.read_lines(self.source):
+			if line in recent:
+				continue
+			recent[line] = None
+			if len(recent) > self.__dedup_window:
+				recent.popitem(last = False)
+			try:
+				message = url.validate(line)[1]
+			except ValueError: # e.g. the port number is not numeric, or an IPv6 address is not closed
+				message = f"Invalid URL: {line}"
+			yield line, message
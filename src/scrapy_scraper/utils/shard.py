@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import multiprocessing, queue, urllib.parse, zlib
+
+class Shard:
+
+	def __init__(self, index: int, count: int, inboxes: list, pending, idle, lock):
+		"""
+		Class for coordinating a crawl across worker processes.\n
+		Each shard owns a hash-partition of hostnames, and links to hostnames owned by other shards are routed to their owners over the shards' inboxes.\n
+		Use 'create()' to create all the shards at once, as they share the same inboxes, the pending counter, the idle flags, and the lock.
+		"""
+		self.index     = index
+		self.count     = count
+		self.__inboxes = inboxes
+		self.__pending = pending # number of links in transit
+		self.__idle    = idle
+		self.__lock    = lock
+		self.__sent    = set()
+
+	def suffix(self, path: str):
+		"""
+		Get the shard's own version of a file path.\n
+		Returns an empty string if the path is empty.
+		"""
+		return f"{path}.{self.index}" if path else ""
+
+	def owner(self, url: str):
+		"""
+		Get the index of the shard owning a URL.\n
+		Python's built-in hash is randomized per process, so CRC-32 is used instead.
+		"""
+		return zlib.crc32((urllib.parse.urlsplit(url).hostname or "").encode("UTF-8")) % self.count
+
+	def owns(self, url: str):
+		"""
+		Check if the shard owns a URL.
+		"""
+		return self.owner(url) == self.index
+
+	def send(self, url: str, depth: int):
+		"""
+		Route a URL to its owning shard.\n
+		The same URL is sent only once.
+		"""
+		if url not in self.__sent:
+			self.__sent.add(url)
+			with self.__lock:
+				self.__pending.value += 1
+			self.__inboxes[self.owner(url)].put((url, depth))
+
+	def receive(self, limit: int) -> list[tuple[str, int]]:
+		"""
+		Receive at most 'limit' URLs, and their depths, routed to the shard.\n
+		Marks the shard as busy if any URLs were received.
+		"""
+		messages = []
+		try:
+			while len(messages) < limit:
+				messages.append(self.__inboxes[self.index].get_nowait())
+		except queue.Empty:
+			pass
+		if messages:
+			with self.__lock:
+				self.__idle[self.index] = 0
+				self.__pending.value -= len(messages)
+		return messages
+
+	def set_idle(self):
+		"""
+		Mark the shard as idle.\n
+		Returns 'True' if the whole crawl is done.
+		"""
+		with self.__lock:
+			self.__idle[self.index] = 1
+			return self.__is_done()
+
+	def is_done(self):
+		"""
+		Check if the shard is idle, and the whole crawl is done.
+		"""
+		with self.__lock:
+			return bool(self.__idle[self.index]) and self.__is_done()
+
+	def __is_done(self):
+		"""
+		Check if all the shards are idle, and no URLs are in transit.\n
+		Must be called while holding the lock.
+		"""
+		return all(self.__idle) and self.__pending.value == 0
+
+def create(count: int) -> list[Shard]:
+	"""
+	Create the specified number of shards for worker processes started with the spawn context.
+	"""
+	context = multiprocessing.get_context("spawn")
+	inboxes = [context.Queue() for _ in range(count)]
+	pending = context.Value("q", 0, lock = False)
+	idle    = context.Array("b", count, lock = False)
+	lock    = context.Lock()
+	return [Shard(index, count, inboxes, pending, idle, lock) for index in range(count)]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import gzip, io, lxml.etree, typing, zlib
+
+ROBOTS    = "/robots.txt"
+SITEMAP   = "/sitemap.xml"
+__GZIP    = b"\x1f\x8b"
+__ENTRIES = ["{*}sitemap", "{*}url"] # with or without a namespace
+
+def get_robots_sitemaps(content: str) -> list[str]:
+	"""
+	Get the sitemaps listed in a 'robots.txt' file, i.e. the values of its 'Sitemap' directives.
+	"""
+	tmp = []
+	for line in content.splitlines():
+		name, _, value = line.split("#", 1)[0].partition(":")
+		value = value.strip()
+		if name.strip().lower() == "sitemap" and value:
+			tmp.append(value)
+	return tmp
+
+def parse(content: bytes) -> typing.Iterator[tuple[str, str]]:
+	"""
+	Parse a sitemap or a sitemap index incrementally, [gzip-compressed or not].\n
+	The content is decompressed and parsed as a stream, and each entry is discarded once parsed, so the whole sitemap is never held in memory as a tree.\n
+	Yields the entry type, i.e. 'sitemap' for a nested sitemap and 'url' for a page, and the entry location.\n
+	Parsing stops at the first unrecoverable error.
+	"""
+	stream = io.BytesIO(content)
+	if content.startswith(__GZIP):
+		stream = gzip.GzipFile(fileobj = stream)
+	try:
+		for _, element in lxml.etree.iterparse(stream, events = ("end",), tag = __ENTRIES, no_network = True, resolve_entities = False, huge_tree = True, recover = True):
+			location = element.findtext("{*}loc")
+			if location and location.strip():
+				yield element.tag.rpartition("}")[2], location.strip()
+			element.clear()
+			while element.getprevious() is not None: # drop the already parsed siblings too
+				del element.getparent()[0]
+	except (lxml.etree.LxmlError, OSError, EOFError, zlib.error):
+		pass
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+from scrapy            import Spider, signals
+from scrapy.crawler    import Crawler
+from scrapy.exceptions import NotConfigured, StopDownload
+from scrapy.http       import Headers, Request
+
+import urllib.parse
+
+__TEXT_TYPES       = ["text/", "html", "xml", "json", "javascript", "ecmascript"]
+__JAVASCRIPT_TYPES = ["javascript", "ecmascript"]
+
+def __get_content_type(headers: Headers):
+	"""
+	Get the lowercased media type from the 'Content-Type' HTTP response header.
+	"""
+	return headers.get("Content-Type", b"").decode("ISO-8859-1").split(";", 1)[0].strip().lower()
+
+def is_javascript(url: str, headers: Headers):
+	"""
+	Check if a response is a JavaScript file, by its media type or by its URL.
+	"""
+	content_type = __get_content_type(headers)
+	return any(kind in content_type for kind in __JAVASCRIPT_TYPES) or urllib.parse.urlsplit(url).path.lower().endswith(".js")
+
+def is_text(headers: Headers):
+	"""
+	Check if a response is text, e.g. HTML, JavaScript, JSON, or XML.\n
+	Responses without a media type are assumed to be text.
+	"""
+	content_type = __get_content_type(headers)
+	return not content_type or any(kind in content_type for kind in __TEXT_TYPES)
+
+class SizeLimits:
+
+	def __init__(self, crawler: Crawler, max_html: int, max_js: int):
+		"""
+		Class for bounding the memory of each response by its content type, while the response is still downloading.\n
+		Bodies that are not text, e.g. images, videos, and archives, are dropped as soon as their headers are received.\n
+		JavaScript bodies are truncated after 'max_js' bytes, and all the other text bodies, e.g. HTML, after 'max_html' bytes, where zero means no limit.\n
+		Truncated and dropped responses are still passed to the callback, flagged as 'download_stopped' by Scrapy.\n
+		'robots.txt' and sitemaps are never limited.
+		"""
+		self.__crawler  = crawler
+		self.__max_html = max_html
+		self.__max_js   = max_js
+
+	@classmethod
+	def from_crawler(cls, crawler: Crawler):
+		"""
+		Scrapy's extension factory.
+		"""
+		max_html = crawler.settings.getint("MAX_HTML_SIZE")
+		max_js   = crawler.settings.getint("MAX_JS_SIZE")
+		if not max_html and not max_js:
+			raise NotConfigured
+		extension = cls(crawler, max_html, max_js)
+		crawler.signals.connect(extension.headers_received, signal = signals.headers_received)
+		crawler.signals.connect(extension.bytes_received, signal = signals.bytes_received)
+		return extension
+
+	def headers_received(self, headers: Headers, body_length: int, request: Request, spider: Spider):
+		"""
+		On headers received callback.
+		"""
+		if request.meta.get("is_sitemap"):
+			return
+		javascript = is_javascript(request.url, headers) # e.g. served as 'application/octet-stream'
+		if not javascript and not is_text(headers):
+			self.__crawler.stats.inc_value("scrapy_scraper/size_dropped")
+			raise StopDownload(fail = False)
+		limit = self.__max_js if javascript else self.__max_html
+		request.meta["size_limit"   ] = limit # custom attribute
+		request.meta["size_received"] = 0     # custom attribute
+
+	def bytes_received(self, data: bytes, request: Request, spider: Spider):
+		"""
+		On bytes received callback.
+		"""
+		limit = request.meta.get("size_limit")
+		if limit:
+			request.meta["size_received"] += len(data)
+			if request.meta["size_received"] >= limit: # the body received so far is passed to the callback, so the links can still be extracted
+				self.__crawler.stats.inc_value("scrapy_scraper/size_truncated")
+				raise StopDownload(fail = False)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import json, typing
+
+class Stream:
+
+	def __init__(self, out: str, flush_size: int = 100):
+		"""
+		Class for streaming records to a JSONL file in batches.\n
+		If the output file exists, the records are appended to it.
+		"""
+		self.__flush_size = flush_size
+		self.__buffer     = []
+		self.__stream     = open(out, "a", encoding = "UTF-8")
+
+	def write(self, record: dict[str, typing.Any]):
+		"""
+		Buffer a record, and flush the buffer if it is full.
+		"""
+		self.__buffer.append(json.dumps(record, ensure_ascii = False))
+		if len(self.__buffer) >= self.__flush_size:
+			self.flush()
+
+	def flush(self):
+		"""
+		Write the buffered records to the output file.
+		"""
+		if self.__buffer:
+			self.__stream.write("\n".join(self.__buffer) + "\n")
+			self.__stream.flush()
+			self.__buffer.clear()
+
+	def close(self):
+		"""
+		Flush the buffered records and close the output file.
+		"""
+		self.flush()
+		self.__stream.close()
+
+def read(file: str) -> typing.Iterator[dict[str, typing.Any]]:
+	"""
+	Read records from a JSONL file one by one.\n
+	Truncated or invalid lines, e.g. from a killed process, will be skipped.
+	"""
+	with open(file, "r", encoding = "UTF-8") as stream:
+		for line in stream:
+			line = line.strip()
+			if line:
+				try:
+					yield json.loads(line)
+				except json.JSONDecodeError:
+					pass
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+from scrapy                 import Spider
+from scrapy.core.downloader import Slot
+from scrapy.crawler         import Crawler
+from scrapy.exceptions      import IgnoreRequest, NotConfigured
+from scrapy.http            import Request, Response
+
+import dataclasses, datetime, email.utils, time
+
+RATE_LIMITED      = [429, 503]
+LATENCY_TOLERANCE = 2    # latency above the baseline times the tolerance means the host is congested
+LATENCY_DECREASE  = 0.9  # per window
+ERROR_DECREASE    = 0.5  # per window
+BASELINE_DRIFT    = 1.01 # lets the baseline latency follow a host that got permanently slower
+CEILING_RECOVERY  = 0.01 # per response, i.e. probe one more request above the rate limit every hundred responses
+MAX_RETRY_AFTER   = 300
+
+@dataclasses.dataclass
+class Limit:
+	concurrency: float
+	ceiling    : float
+	delay      : float
+	latency    : float = 0 # baseline, i.e. the lowest latency observed recently
+	epoch      : int   = 0 # number of decreases so far
+	retry_until: float = 0 # monotonic deadline of the latest 'Retry-After'
+
+class AdaptiveConcurrency:
+
+	def __init__(self, crawler: Crawler, start: int, maximum: int, delay: float):
+		"""
+		Class for adapting the concurrency limit of each host, i.e. each downloader slot, to the host's feedback.\n
+		The limit is increased additively while the latency stays close to the host's baseline, and decreased multiplicatively when the latency grows, on timeouts and other download errors, and, sharply, on rate limiting.\n
+		If rate limited, 'Retry-After' is honored by delaying the requests to the host until the deadline passes, even if responses to the requests sent earlier still succeed, and the limit is capped just below the rate-limited concurrency, with the cap slowly recovering.\n
+		Errors are reacted to at most once per window, i.e. only errors of requests sent after the latest decrease decrease the limit again.
+		"""
+		self.__crawler = crawler
+		self.__start   = start
+		self.__maximum = maximum
+		self.__delay   = delay
+		self.__limits  = {}
+
+	@classmethod
+	def from_crawler(cls, crawler: Crawler):
+		"""
+		Scrapy's downloader middleware factory.
+		"""
+		if not crawler.settings.getbool("ADAPTIVE_CONCURRENCY"):
+			raise NotConfigured
+		settings = crawler.settings
+		return cls(crawler, settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN"), settings.getint("CONCURRENT_REQUESTS"), settings.getfloat("DOWNLOAD_DELAY"))
+
+	def __get_slot(self, request: Request) -> tuple[str, Slot | None]:
+		"""
+		Get the downloader slot key of a request, and the slot itself.\n
+		The slot is 'None' if it has not been created yet, or has been garbage collected.
+		"""
+		downloader = self.__crawler.engine.downloader
+		key        = downloader.get_slot_key(request)
+		return key, downloader.slots.get(key)
+
+	def __get_limit(self, key: str):
+		"""
+		Get the limit of a host.
+		"""
+		if key not in self.__limits:
+			self.__limits[key] = Limit(self.__start, self.__maximum, self.__delay)
+		return self.__limits[key]
+
+	def __apply(self, slot: Slot | None, limit: Limit):
+		"""
+		Apply the limit to the downloader slot.
+		"""
+		if slot:
+			slot.concurrency = max(1, int(limit.concurrency))
+			slot.delay       = limit.delay
+
+	def __decrease(self, request: Request, limit: Limit, factor: float):
+		"""
+		Decrease the concurrency limit multiplicatively, unless it has already been decreased since the request was sent.\n
+		Returns 'True' if decreased.
+		"""
+		decreased = request.meta.get("adaptive_concurrency_epoch", limit.epoch) == limit.epoch
+		if decreased:
+			limit.concurrency = max(1, limit.concurrency * factor)
+			limit.epoch += 1
+		return decreased
+
+	def process_request(self, request: Request, spider: Spider):
+		key, slot = self.__get_slot(request)
+		limit = self.__get_limit(key)
+		request.meta["adaptive_concurrency_epoch"] = limit.epoch # custom attribute
+		self.__apply(slot, limit) # re-apply to a slot recreated after garbage collection
+
+	def process_response(self, request: Request, response: Response, spider: Spider):
+		key, slot = self.__get_slot(request)
+		limit = self.__get_limit(key)
+		if response.status in RATE_LIMITED:
+			ceiling = max(1, int(limit.concurrency) - 1)
+			if self.__decrease(request, limit, ERROR_DECREASE):
+				limit.ceiling = ceiling
+			delay = get_retry_after(response) or self.__delay * 2 or 1
+			limit.delay       = max(limit.delay, delay)
+			limit.retry_until = max(limit.retry_until, time.monotonic() + delay)
+			self.__crawler.stats.inc_value("scrapy_scraper/rate_limited")
+		else:
+			latency = request.meta.get("download_latency")
+			if latency is not None:
+				limit.latency = min(latency, limit.latency * BASELINE_DRIFT) if limit.latency else latency
+			if latency is not None and latency > limit.latency * LATENCY_TOLERANCE:
+				limit.concurrency = max(1, limit.concurrency - (1 - LATENCY_DECREASE)) # about ten percent less per window
+			else:
+				limit.concurrency = min(limit.ceiling, limit.concurrency + 1 / limit.concurrency) # about one more request per window
+			limit.ceiling = min(self.__maximum, limit.ceiling + CEILING_RECOVERY)
+			if time.monotonic() >= limit.retry_until: # 'Retry-After' has been honored
+				limit.delay = self.__delay
+		self.__apply(slot, limit)
+		return response
+
+	def process_exception(self, request: Request, exception: Exception, spider: Spider):
+		if not isinstance(exception, IgnoreRequest):
+			key, slot = self.__get_slot(request)
+			limit = self.__get_limit(key)
+			self.__decrease(request, limit, ERROR_DECREASE)
+			self.__apply(slot, limit)
+
+def get_retry_after(response: Response):
+	"""
+	Get the number of seconds to wait from the 'Retry-After' HTTP response header, either in seconds or as an HTTP date.\n
+	Returns zero if the header is missing or invalid, and at most 'MAX_RETRY_AFTER' seconds.
+	"""
+	seconds = 0
+	value   = response.headers.get("Retry-After", b"").decode("ISO-8859-1").strip()
+	if value.isdigit():
+		seconds = int(value)
+	elif value:
+		try:
+			seconds = (email.utils.parsedate_to_datetime(value) - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+		except (TypeError, ValueError):
+			pass
+	return min(max(0, seconds), MAX_RETRY_AFTER)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+from . import url
+
+from scrapy            import Spider
+from scrapy.crawler    import Crawler
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http       import Request
+
+class TemplateLimitReached(IgnoreRequest):
+	"""
+	Raised when a request is dropped because its path template has reached the limit.
+	"""
+
+class TemplateLimit:
+
+	def __init__(self, crawler: Crawler, limit: int):
+		"""
+		Class for limiting the number of requests per path template, e.g. 'example.com/item/{n}', so infinite calendars, paginations, and similar crawl traps are cut short.\n
+		Only requests that passed the duplicate filter reach the downloader middlewares, so duplicate links do not count towards the limit.\n
+		Start URLs, 'robots.txt', and sitemaps are never dropped.
+		"""
+		self.__crawler = crawler
+		self.__limit   = limit
+		self.__counts  = {}
+
+	@classmethod
+	def from_crawler(cls, crawler: Crawler):
+		"""
+		Scrapy's downloader middleware factory.
+		"""
+		limit = crawler.settings.getint("TEMPLATE_LIMIT")
+		if limit < 1:
+			raise NotConfigured
+		return cls(crawler, limit)
+
+	def process_request(self, request: Request, spider: Spider):
+		if request.meta.get("is_start_url") or request.meta.get("is_sitemap") or request.meta.get("template_limit_url") == request.url: # e.g. a retry
+			return
+		request.meta["template_limit_url"] = request.url # custom attribute
+		template = url.get_path_template(request.url)
+		count    = self.__counts.get(template, 0)
+		if count >= self.__limit:
+			self.__crawler.stats.inc_value("scrapy_scraper/template_limited")
+			raise TemplateLimitReached(f"Path template limit reached: {template}")
+		self.__counts[template] = count + 1
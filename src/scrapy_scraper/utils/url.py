@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
-import tldextract, urllib.parse
+import re, urllib.parse
 
 __URL_SCHEME_WHITELIST = ["http", "https", "socks4", "socks4h", "socks5", "socks5h"]
 __MIN_PORT_NUM         = 1
 __MAX_PORT_NUM         = 65535
+__PATH_UUID            = r"[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}"
+__PATH_TOKEN           = re.compile(rf"{__PATH_UUID}|[0-9a-z]+", re.IGNORECASE)
+__PATH_IDENTIFIER      = re.compile(rf"{__PATH_UUID}|(?=.*\d)[0-9a-f]{{8,}}", re.IGNORECASE) # e.g. UUIDs and hashes
+__PATH_NUMBER          = re.compile(r"\d+")
+__DEFAULT_PORTS        = {"http": 80, "https": 443}
+__TRACKING_PARAMETER   = re.compile(r"utm_\w+|gclid|dclid|gbraid|wbraid|fbclid|msclkid|yclid|mc_cid|mc_eid|_ga|_gl|_hsenc|_hsmi|igshid", re.IGNORECASE)
 
 def validate(url: str):
 	"""
@@ -42,6 +48,7 @@ def extract_fqdn(url: str) -> str:
 	Extract the fully qualified domain name from a URL.\n
 	Returns an empty string on failure.
 	"""
+	import tldextract # lazy, slow to import, and may refresh its public suffix list
 	tmp = ""
 	obj = tldextract.extract(url)
 	if obj.fqdn:
@@ -59,3 +66,42 @@ def extract_fqdn_multiple(urls: list[str]) -> list[str]:
 		if url:
 			tmp.append(url)
 	return tmp
+
+def get_path_template(url: str) -> str:
+	"""
+	Get the path template of a URL, i.e. the domain name and the path, with identifiers and numbers replaced by placeholders.\n
+	e.g. 'https://example.com/post/123/page-2' becomes 'example.com/post/{n}/page-{n}', and 'https://example.com/app.5f3a9c1d.js' becomes 'example.com/app.{id}.js'.
+	"""
+	obj = urllib.parse.urlsplit(url)
+	return obj.netloc.lower() + __PATH_TOKEN.sub(__get_token_template, obj.path)
+
+def __get_token_template(match: re.Match) -> str:
+	"""
+	Get the template of a path token.
+	"""
+	token = match.group(0)
+	return "{id}" if __PATH_IDENTIFIER.fullmatch(token) else __PATH_NUMBER.sub("{n}", token)
+
+def canonicalize(url: str) -> str:
+	"""
+	Canonicalize a URL, i.e. lowercase the scheme and the domain name, and remove the default port number, the fragment, and the tracking query string parameters, e.g. 'utm_source'.\n
+	The remaining query string parameters are sorted, and their percent-encoding is normalized.\n
+	Returns the URL as is on failure.
+	"""
+	import w3lib.url # lazy, only needed if canonicalizing
+	tmp = url
+	try:
+		obj    = urllib.parse.urlsplit(url)
+		scheme = obj.scheme.lower()
+		netloc = obj.hostname or ""
+		if ":" in netloc: # IPv6
+			netloc = f"[{netloc}]"
+		if obj.port and obj.port != __DEFAULT_PORTS.get(scheme):
+			netloc = f"{netloc}:{obj.port}"
+		if "@" in obj.netloc:
+			netloc = f"{obj.netloc.rsplit('@', 1)[0]}@{netloc}"
+		query  = ("&").join(parameter for parameter in obj.query.split("&") if parameter and not __TRACKING_PARAMETER.fullmatch(urllib.parse.unquote_plus(parameter.split("=", 1)[0])))
+		tmp    = w3lib.url.canonicalize_url(urllib.parse.urlunsplit((scheme, netloc, obj.path, query, "")))
+	except ValueError:
+		pass
+	return tmp
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
-from . import config, cookie, directory, file, general, header, url
+from . import config, cookie, directory, file, frontier, general, header, priority, readiness, screenshot, seed, url
 
-import argparse, bot_safe_agents, sys
+import argparse, sys
 
 class MyArgParser(argparse.ArgumentParser):
 
@@ -16,18 +16,52 @@ class MyArgParser(argparse.ArgumentParser):
 		print("    Probe, crawl, scrape, and screenshot websites")
 		print("URLS")
 		print("    File containing URLs or a single URL to start collecting from")
+		print("    File is read lazily, i.e. collecting starts right away, and invalid URLs are skipped")
 		print("    -u, --urls = urls.txt | https://example.com/home | etc.")
 		print("WHITELIST")
 		print("    File containing whitelisted domain names to limit the scope")
 		print("    Specify 'off' to disable domain whitelisting")
 		print("    Default: limit the scope to domain names extracted from the starting URLs")
+		print("    If reading the starting URLs from a file, domain names are whitelisted as the URLs are read, and links to domain names whitelisted later are moved to in-scope links at the end")
 		print("    -w, --whitelist = whitelist.txt | off | etc.")
 		print("PLAYWRIGHT")
 		print("    Use Playwright's headless browser")
 		print("    -p, --playwright")
+		print("PLAYWRIGHT HYBRID")
+		print("    Fetch pages without the headless browser first, and use the headless browser only for pages that need JavaScript rendering")
+		print("    e.g. single-page application shells, or pages with fewer anchors than external scripts")
+		print("    -ph, --playwright-hybrid")
 		print("PLAYWRIGHT WAIT")
 		print("    Wait time in seconds before fetching the page content")
+		print("    If a readiness strategy is specified, the maximum wait time instead")
 		print("    -pw, --playwright-wait = 0.5 | 2 | 4 | etc.")
+		print("PLAYWRIGHT CONTEXTS")
+		print("    Number of long-lived browser contexts to rotate the pages through")
+		print("    Pages in the same browser context share cookies")
+		print("    A pool without queued pages is closed after 30 seconds")
+		print("    Default: a new browser context for each page")
+		print("    -pc, --playwright-contexts = 4 | 10 | etc.")
+		print("PLAYWRIGHT CONTEXT PAGES")
+		print("    Number of pages after which a pooled browser context is recycled, including the browser contexts dedicated to screenshots")
+		print("    Default: 100")
+		print("    -pcp, --playwright-context-pages = 50 | 200 | etc.")
+		print("PLAYWRIGHT CONTEXTS DOMAIN")
+		print("    Keep a separate pool of browser contexts for each domain name")
+		print("    At most 100 browser contexts are pooled at once, e.g. 25 domain names get their own pool if '-pc' is 4")
+		print("    Pages of further domain names share an overflow pool, and its cookies, until an idle pool is closed")
+		print("    -pcd, --playwright-contexts-domain")
+		print("PLAYWRIGHT NETWORK")
+		print("    Capture the network traffic of the headless browser, and collect every URL a page requests as an extracted link")
+		print("    e.g. XHR and fetch requests, including the ones blocked to save bandwidth")
+		print("    -pn, --playwright-network")
+		print("PLAYWRIGHT READINESS")
+		print("    Fetch the page content as soon as the page is ready, instead of after the fixed wait time")
+		print("    Specify 'networkidle' to wait until there are no network connections for 0.5 seconds")
+		print("    Specify 'mutations' to wait until the DOM has not changed for 0.5 seconds")
+		print("    Specify 'selector:<css>' to wait until the CSS selector matches an element")
+		print("    Playwright's wait time is the maximum wait time, if the page is not ready by then, the page content is fetched as is")
+		print(f"    Default maximum wait time: {readiness.TIMEOUT}")
+		print("    -prd, --playwright-readiness = networkidle | mutations | selector:#app | etc.")
 		print("CONCURRENT REQUESTS")
 		print("    Number of concurrent requests")
 		print("    Default: 30")
@@ -36,6 +70,11 @@ class MyArgParser(argparse.ArgumentParser):
 		print("    Number of concurrent requests per domain")
 		print("    Default: 10")
 		print("    -crd, --concurrent-requests-domain = 10 | 15 | etc.")
+		print("SHARDS")
+		print("    Number of worker processes to split the crawl between, e.g. the number of CPU cores")
+		print("    Each worker process crawls its own share of domain names, and the concurrent requests are split between them")
+		print("    Each worker process has its own stream, hash index, and metrics file, e.g. 'results.jsonl.0', and its own metrics port, i.e. port + worker")
+		print("    -sh, --shards = 4 | 8 | etc.")
 		print("SLEEP")
 		print("    Sleep time in seconds between two consecutive requests to the same domain")
 		print("    -s, --sleep = 1.5 | 3 | etc.")
@@ -46,6 +85,11 @@ class MyArgParser(argparse.ArgumentParser):
 		print("    Automatically throttle concurrent requests based on load and latency")
 		print("    Sleep time is still respected")
 		print("    -at, --auto-throttle = 0.5 | 10 | 15 | 30 | etc.")
+		print("ADAPTIVE CONCURRENCY")
+		print("    Adapt the concurrency of each domain to its latency and errors, starting from the number of concurrent requests per domain")
+		print("    Increases additively while the latency stays low, decreases multiplicatively on high latency, timeouts, and errors")
+		print("    Backs off sharply on rate limiting, i.e. 429 and 503, and honors 'Retry-After'")
+		print("    -ac, --adaptive-concurrency")
 		print("RETRIES")
 		print("    Number of retries per URL")
 		print("    Default: 2")
@@ -56,6 +100,41 @@ class MyArgParser(argparse.ArgumentParser):
 		print("    Specify '0' for no limit")
 		print("    Default: 1")
 		print("    -r, --recursion = off | 0 | 5 | etc.")
+		print("SCHEDULING POLICY")
+		print("    Order in which to crawl the links")
+		print("    Specify 'depth' for depth-first, 'breadth' for breadth-first, or 'host' for breadth-first with round-robin across hosts")
+		print("    Default: depth")
+		print("    -sp, --scheduling-policy = depth | breadth | host")
+		print("SCORING")
+		print("    Comma-separated scoring hooks to prioritize the links with")
+		print("    Specify 'js' to prefer JavaScript files, 'templates' to prefer unseen path templates, or an import path of a custom hook")
+		print("    -sc, --scoring = js | js,templates | package.module.Scorer | etc.")
+		print("CANONICALIZE")
+		print("    Canonicalize the links before crawling them")
+		print("    Removes fragments and tracking query string parameters, e.g. 'utm_source', sorts the remaining query string parameters, lowercases schemes and domain names, and removes default port numbers")
+		print("    -cn, --canonicalize")
+		print("TEMPLATE LIMIT")
+		print("    Maximum number of requests per path template, e.g. 'example.com/item/{n}', to cut crawl traps short")
+		print("    Start URLs are not limited")
+		print("    -tl, --template-limit = 100 | 500 | etc.")
+		print("SITEMAPS")
+		print("    Seed the crawl from the sitemaps of each starting URL's domain, i.e. '/sitemap.xml' and sitemaps listed in '/robots.txt'")
+		print("    Supports gzip-compressed sitemaps and nested sitemap indexes, sitemaps are parsed incrementally")
+		print("    Sitemap URLs are crawled as if linked from the starting URLs, i.e. at the recursion depth of one")
+		print("    -sm, --sitemaps")
+		print("MAX HTML")
+		print("    Maximum size of HTML and other text responses in bytes, the rest of a response is not downloaded")
+		print("    Links are extracted from the truncated responses")
+		print("    If any size limit is specified, responses that are neither text nor JavaScript, e.g. images and archives, are dropped as soon as their headers are received")
+		print("    -mh, --max-html = 1048576 | 5242880 | etc.")
+		print("MAX JS")
+		print("    Maximum size of JavaScript responses in bytes, the rest of a response is not downloaded")
+		print("    If downloading, the part received of a truncated JavaScript file is written to a file ending with '.truncated.js'")
+		print("    -mj, --max-js = 5242880 | 20971520 | etc.")
+		print("EXTENDED EXTRACTION")
+		print("    Also extract endpoints from JavaScript files and inline scripts, and links from 'srcset', 'form', 'iframe', and 'meta' refresh")
+		print("    Endpoints are URLs and paths in string literals, e.g. '/api/v1/users'")
+		print("    -ee, --extended-extraction")
 		print("REQUEST TIMEOUT")
 		print("    Request timeout in seconds")
 		print("    Default: 60")
@@ -77,19 +156,89 @@ class MyArgParser(argparse.ArgumentParser):
 		print("    Output directory for downloaded JavaScript files")
 		print("    Automatically beautifies the files")
 		print("    -d, --downloads = downloads | etc.")
+		print("DOWNLOAD HASH")
+		print("    Store downloaded JavaScript files by the SHA-256 hash of their content")
+		print("    Same content is stored only once, and URLs are mapped to hashes in 'index.jsonl'")
+		print("    -dh, --download-hash")
 		print("SCREENSHOTS")
 		print("    Output directory for screenshots")
 		print("    -ss, --screenshots = screenshots | etc.")
+		print("SCREENSHOT VIEWPORT")
+		print("    Viewport of the headless browser for screenshots, i.e. width x height")
+		print("    Default: 1280x720")
+		print("    -sv, --screenshot-viewport = 1920x1080 | 800x600 | etc.")
+		print("SCREENSHOT FORMAT")
+		print("    Image format of screenshots")
+		print("    WebP requires Pillow, i.e. 'pip3 install pillow'")
+		print("    Default: png")
+		print("    -sf, --screenshot-format = png | jpeg | webp")
+		print("SCREENSHOT QUALITY")
+		print("    Image quality of JPEG and WebP screenshots, from 1 to 100")
+		print("    Default: 80")
+		print("    -sq, --screenshot-quality = 60 | 90 | etc.")
+		print("SCREENSHOT THUMBNAIL")
+		print("    Also generate a thumbnail of each screenshot with the specified width, e.g. 'example.com.thumbnail.png'")
+		print("    Requires Pillow, i.e. 'pip3 install pillow'")
+		print("    -st, --screenshot-thumbnail = 320 | 480 | etc.")
+		print("SCREENSHOT WORKERS")
+		print("    Number of screenshots to capture at once, and of browser contexts dedicated to screenshots")
+		print("    Content of pages taking screenshots is not blocked, unlike the content of other pages")
+		print("    Default: 4")
+		print("    -sw, --screenshot-workers = 2 | 8 | etc.")
 		print("OUT")
 		print("    Output file")
 		print("    -o, --out = results.json | etc.")
+		print("STREAM OUT")
+		print("    Output file for streaming the results in JSONL format as they are collected")
+		print("    If the file exists, the results are appended to it")
+		print("    At the end, the streamed results are compacted into the output file")
+		print("    Collected links are deduplicated within a window of the most recently seen links, unless '-bf' is specified, so memory stays bounded")
+		print("    Links seen again beyond the window are streamed again, and deduplicated when compacting")
+		print("    -so, --stream-out = results.jsonl | etc.")
+		print("NO COMPACT")
+		print("    Do not compact the streamed results into the output file at the end, as compacting loads all the results into memory")
+		print("    The output file is not written, and the streamed results may contain duplicate links, where an in-scope link overrides an out-of-scope one")
+		print("    Requires '-so' or '-j'")
+		print("    -nc, --no-compact")
+		print("BLOOM FILTER")
+		print("    Deduplicate requests and collected links with a memory-bounded Bloom filter, instead of storing every URL")
+		print("    Specify the false-positive rate, i.e. the share of new URLs that might be skipped as duplicates")
+		print("    Memory usage is reported in the live crawl metrics")
+		print("    -bf, --bloom-filter = 0.001 | 0.0001 | etc.")
+		print("JOB")
+		print("    Directory for persisting the crawl state, i.e. the request queue, the seen requests, and the results")
+		print("    Press CTRL + C once to pause the crawl, and run again with the same directory to resume it")
+		print("    Results are streamed to 'results.jsonl' inside the directory, unless '-so' is specified")
+		print("    -j, --job = job | etc.")
+		print("CACHE")
+		print("    Directory for caching the validators, i.e. ETag and Last-Modified, and the extracted links of each response between runs")
+		print("    On re-crawl, requests are made conditional, and unchanged responses are neither parsed nor downloaded again")
+		print("    Responses fetched with the headless browser are never cached")
+		print("    -c, --cache = cache | etc.")
+		print("FRONTIER")
+		print("    Frontier to share the crawl with other Scrapy Scraper instances, on this or other machines")
+		print("    URLs to crawl are pulled from a shared queue, and the discovered links are pushed to it, so each URL is crawled at most once")
+		print("    Each instance keeps its own output file, and stops once it is idle and the queue is empty")
+		print("    If the frontier cannot be reached, the connection is reopened on the next call, and an instance that is idle stops")
+		print("    -f, --frontier = sqlite:///frontier.db | redis://127.0.0.1:6379/0 | etc.")
+		print("METRICS")
+		print("    Output file for periodically appending the live crawl metrics in JSONL format")
+		print("    e.g. throughput, queue depth, in-flight requests per domain, retries, errors, bytes downloaded, etc.")
+		print("    -m, --metrics = metrics.jsonl | etc.")
+		print("METRICS INTERVAL")
+		print("    Interval in seconds between two consecutive metrics")
+		print("    Default: 10")
+		print("    -mi, --metrics-interval = 5 | 30 | etc.")
+		print("METRICS PORT")
+		print("    Serve the live crawl metrics in Prometheus' text format on a local HTTP endpoint")
+		print("    -mp, --metrics-port = 9100 | etc.")
 		print("DEBUG")
 		print("    Enable debug output")
 		print("    -dbg, --debug")
 
 	def error(self, message):
 		if len(sys.argv) > 1:
-			print("Missing a mandatory option (-u, -o) and/or optional (-w, -p, -pw, -cr, -crd, -s, -rs, -at, -rt, -r, -t, -H, -b, -a, -x, -d, -ss, -dbg)")
+			print("Missing a mandatory option (-u, -o) and/or optional (-w, -p, -ph, -pw, -pc, -pcp, -pcd, -pn, -prd, -cr, -crd, -sh, -s, -rs, -at, -ac, -rt, -r, -sp, -sc, -cn, -tl, -sm, -mh, -mj, -ee, -t, -H, -b, -a, -x, -d, -dh, -ss, -sv, -sf, -sq, -st, -sw, -so, -nc, -bf, -j, -c, -f, -m, -mi, -mp, -dbg)")
 			print("Use -h or --help for more info")
 		else:
 			self.print_help()
@@ -105,22 +254,53 @@ class Validate:
 		self.__parser.add_argument("-u"  , "--urls"                      , required = True , type   = str         , default = ""   )
 		self.__parser.add_argument("-w"  , "--whitelist"                 , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-p"  , "--playwright"                , required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-ph" , "--playwright-hybrid"         , required = False, action = "store_true", default = False)
 		self.__parser.add_argument("-pw" , "--playwright-wait"           , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-pc" , "--playwright-contexts"       , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-pcp", "--playwright-context-pages"  , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-pcd", "--playwright-contexts-domain", required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-pn" , "--playwright-network"        , required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-prd", "--playwright-readiness"      , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-cr" , "--concurrent-requests"       , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-crd", "--concurrent-requests-domain", required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sh" , "--shards"                    , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-s"  , "--sleep"                     , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-rs" , "--random-sleep"              , required = False, action = "store_true", default = False)
 		self.__parser.add_argument("-at" , "--auto-throttle"             , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-ac" , "--adaptive-concurrency"      , required = False, action = "store_true", default = False)
 		self.__parser.add_argument("-rt" , "--retries"                   , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-r"  , "--recursion"                 , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sp" , "--scheduling-policy"         , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sc" , "--scoring"                   , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-cn" , "--canonicalize"              , required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-tl" , "--template-limit"            , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sm" , "--sitemaps"                  , required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-mh" , "--max-html"                  , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-mj" , "--max-js"                    , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-ee" , "--extended-extraction"       , required = False, action = "store_true", default = False)
 		self.__parser.add_argument("-t"  , "--request-timeout"           , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-H"  , "--header"                    , required = False, action = "append"    , nargs   = "+"  )
 		self.__parser.add_argument("-b"  , "--cookie"                    , required = False, action = "append"    , nargs   = "+"  )
 		self.__parser.add_argument("-a"  , "--user-agent"                , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-x"  , "--proxy"                     , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-d"  , "--downloads"                 , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-dh" , "--download-hash"             , required = False, action = "store_true", default = False)
 		self.__parser.add_argument("-ss" , "--screenshots"               , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sv" , "--screenshot-viewport"       , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sf" , "--screenshot-format"         , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sq" , "--screenshot-quality"        , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-st" , "--screenshot-thumbnail"      , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-sw" , "--screenshot-workers"        , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-o"  , "--out"                       , required = True , type   = str         , default = ""   )
+		self.__parser.add_argument("-so" , "--stream-out"                , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-nc" , "--no-compact"                , required = False, action = "store_true", default = False)
+		self.__parser.add_argument("-bf" , "--bloom-filter"              , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-j"  , "--job"                       , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-c"  , "--cache"                     , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-f"  , "--frontier"                  , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-m"  , "--metrics"                   , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-mi" , "--metrics-interval"          , required = False, type   = str         , default = ""   )
+		self.__parser.add_argument("-mp" , "--metrics-port"              , required = False, type   = str         , default = ""   )
 		self.__parser.add_argument("-dbg", "--debug"                     , required = False, action = "store_true", default = False)
 
 	def validate_args(self):
@@ -131,13 +311,25 @@ class Validate:
 		self.__args = self.__parser.parse_args()
 		self.__validate_urls()
 		self.__validate_whitelist()
+		self.__validate_playwright_hybrid()
 		self.__validate_playwright_wait()
+		self.__validate_playwright_contexts()
+		self.__validate_playwright_context_pages()
+		self.__validate_playwright_network()
+		self.__validate_playwright_readiness()
 		self.__validate_concurrent_requests()
 		self.__validate_concurrent_requests_domain()
+		self.__validate_shards()
 		self.__validate_sleep()
 		self.__validate_auto_throttle()
+		self.__validate_adaptive_concurrency()
 		self.__validate_retries()
 		self.__validate_recursion()
+		self.__validate_scheduling_policy()
+		self.__validate_scoring()
+		self.__validate_template_limit()
+		self.__validate_max_html()
+		self.__validate_max_js()
 		self.__validate_request_timeout()
 		self.__validate_header()
 		self.__validate_cookie()
@@ -145,6 +337,20 @@ class Validate:
 		self.__validate_proxy()
 		self.__validate_downloads()
 		self.__validate_screenshots()
+		self.__validate_screenshot_viewport()
+		self.__validate_screenshot_format()
+		self.__validate_screenshot_quality()
+		self.__validate_screenshot_thumbnail()
+		self.__validate_screenshot_workers()
+		self.__validate_stream_out()
+		self.__validate_no_compact()
+		self.__validate_bloom_filter()
+		self.__validate_job()
+		self.__validate_cache()
+		self.__validate_frontier()
+		self.__validate_metrics()
+		self.__validate_metrics_interval()
+		self.__validate_metrics_port()
 		return self.__success, self.__args
 
 	def __error(self, message: str):
@@ -157,25 +363,15 @@ class Validate:
 	# ------------------------------------
 
 	def __validate_urls(self):
-		tmp = []
-		if file.is_file(self.__args.urls):
-			success, message = file.validate(self.__args.urls)
+		tmp = seed.Seeds(self.__args.urls)
+		if tmp.is_file:
+			success, message = file.validate(self.__args.urls) # the URLs themselves are validated as they are read
 			if not success:
 				self.__error(message)
-			else:
-				tmp = file.read_array(self.__args.urls)
-				if not tmp:
-					self.__error(f"No URLs were found in \"{self.__args.urls}\"")
-				else:
-					success, message = url.validate_multiple(tmp)
-					if not success:
-						self.__error(message)
 		else:
 			success, message = url.validate(self.__args.urls)
 			if not success:
 				self.__error(message)
-			else:
-				tmp = [self.__args.urls]
 		self.__args.urls = tmp
 
 	def __validate_whitelist(self):
@@ -193,12 +389,18 @@ class Validate:
 					tmp = url.extract_fqdn_multiple(file.read_array(self.__args.whitelist))
 					if not tmp:
 						self.__error(f"No valid domain names were found in \"{self.__args.whitelist}\"")
+		elif self.__success and self.__args.urls.is_file:
+			tmp = None # whitelisted as the URLs are read
 		elif self.__success:
-			tmp = url.extract_fqdn_multiple(self.__args.urls)
+			tmp = url.extract_fqdn_multiple([self.__args.urls.source])
 			if not tmp:
 				self.__error("No valid domain names were found in the provided URLs for domain whitelisting")
 		self.__args.whitelist = tmp
 
+	def __validate_playwright_hybrid(self):
+		if self.__args.playwright_hybrid and self.__args.playwright:
+			self.__error("Playwright's headless browser can be used either for all pages or in the hybrid mode, not both")
+
 	def __validate_playwright_wait(self):
 		tmp = 0
 		if self.__args.playwright_wait:
@@ -209,6 +411,46 @@ class Validate:
 				self.__error("Playwright's wait time must be greater than zero")
 		self.__args.playwright_wait = tmp
 
+	def __validate_playwright_contexts(self):
+		tmp = 0
+		if self.__args.playwright_contexts:
+			if not self.__args.playwright_contexts.isdigit():
+				self.__error("Number of Playwright's browser contexts must be numeric")
+			else:
+				tmp = int(self.__args.playwright_contexts)
+				if tmp <= 0:
+					self.__error("Number of Playwright's browser contexts must be greater than zero")
+				elif not self.__args.playwright and not self.__args.playwright_hybrid:
+					self.__error("Playwright's headless browser is required for pooling browser contexts")
+		elif self.__args.playwright_contexts_domain:
+			self.__error("Number of Playwright's browser contexts is required for keeping a pool per domain name")
+		self.__args.playwright_contexts = tmp
+
+	def __validate_playwright_context_pages(self):
+		tmp = 100
+		if self.__args.playwright_context_pages:
+			if not self.__args.playwright_context_pages.isdigit():
+				self.__error("Number of pages per Playwright's browser context must be numeric")
+			else:
+				tmp = int(self.__args.playwright_context_pages)
+				if tmp <= 0:
+					self.__error("Number of pages per Playwright's browser context must be greater than zero")
+				elif not self.__args.playwright_contexts and not self.__args.screenshots:
+					self.__error("Pooling browser contexts or taking screenshots is required for recycling browser contexts")
+		self.__args.playwright_context_pages = tmp
+
+	def __validate_playwright_network(self):
+		if self.__args.playwright_network and not self.__args.playwright and not self.__args.playwright_hybrid:
+			self.__error("Playwright's headless browser is required for capturing the network traffic")
+
+	def __validate_playwright_readiness(self):
+		if self.__args.playwright_readiness:
+			success, message = readiness.validate(self.__args.playwright_readiness)
+			if not success:
+				self.__error(message)
+			elif not self.__args.playwright and not self.__args.playwright_hybrid:
+				self.__error("Playwright's headless browser is required for the readiness strategy")
+
 	def __validate_concurrent_requests(self):
 		tmp = 30
 		if self.__args.concurrent_requests:
@@ -231,6 +473,19 @@ class Validate:
 					self.__error("Number of concurrent requests per domain must be greater than zero")
 		self.__args.concurrent_requests_domain = tmp
 
+	def __validate_shards(self):
+		tmp = 1
+		if self.__args.shards:
+			if not self.__args.shards.isdigit():
+				self.__error("Number of shards must be numeric")
+			else:
+				tmp = int(self.__args.shards)
+				if tmp <= 0:
+					self.__error("Number of shards must be greater than zero")
+				elif tmp > 1 and self.__args.job:
+					self.__error("Job directory is not supported with multiple shards")
+		self.__args.shards = tmp
+
 	def __validate_sleep(self,):
 		tmp = 0
 		if self.__args.sleep:
@@ -251,6 +506,10 @@ class Validate:
 				self.__error("Auto throttle must be greater than zero")
 		self.__args.auto_throttle = tmp
 
+	def __validate_adaptive_concurrency(self):
+		if self.__args.adaptive_concurrency and self.__args.auto_throttle:
+			self.__error("Adaptive concurrency and auto throttle are mutually exclusive")
+
 	def __validate_retries(self):
 		tmp = 2
 		if self.__args.retries:
@@ -275,6 +534,56 @@ class Validate:
 					self.__error("Recursion depth must be either 'off' or numeric equal to or greater than zero")
 		self.__args.recursion = tmp
 
+	def __validate_scheduling_policy(self):
+		tmp = "depth"
+		if self.__args.scheduling_policy:
+			tmp = self.__args.scheduling_policy.lower()
+			if tmp not in ["depth", "breadth", "host"]:
+				self.__error("Supported scheduling policies are 'depth', 'breadth', and 'host'")
+		self.__args.scheduling_policy = tmp
+
+	def __validate_scoring(self):
+		tmp = []
+		if self.__args.scoring:
+			tmp = [name.strip() for name in self.__args.scoring.split(",") if name.strip()]
+			success, message = priority.validate(tmp)
+			if not success:
+				self.__error(message)
+		self.__args.scoring = tmp
+
+	def __validate_template_limit(self):
+		tmp = 0
+		if self.__args.template_limit:
+			if not self.__args.template_limit.isdigit():
+				self.__error("Number of requests per path template must be numeric")
+			else:
+				tmp = int(self.__args.template_limit)
+				if tmp <= 0:
+					self.__error("Number of requests per path template must be greater than zero")
+		self.__args.template_limit = tmp
+
+	def __validate_max_html(self):
+		tmp = 0
+		if self.__args.max_html:
+			if not self.__args.max_html.isdigit():
+				self.__error("Maximum HTML size must be numeric")
+			else:
+				tmp = int(self.__args.max_html)
+				if tmp <= 0:
+					self.__error("Maximum HTML size must be greater than zero")
+		self.__args.max_html = tmp
+
+	def __validate_max_js(self):
+		tmp = 0
+		if self.__args.max_js:
+			if not self.__args.max_js.isdigit():
+				self.__error("Maximum JavaScript size must be numeric")
+			else:
+				tmp = int(self.__args.max_js)
+				if tmp <= 0:
+					self.__error("Maximum JavaScript size must be greater than zero")
+		self.__args.max_js = tmp
+
 	def __validate_request_timeout(self):
 		tmp = 60
 		if self.__args.request_timeout:
@@ -311,6 +620,8 @@ class Validate:
 		tmp = [config.USER_AGENT]
 		if self.__args.user_agent:
 			lower = self.__args.user_agent.lower()
+			if lower in ["random-all", "random"]:
+				import bot_safe_agents # lazy, only needed for random user agents
 			if lower == "random-all":
 				tmp = bot_safe_agents.get_all()
 			elif lower == "random":
@@ -328,13 +639,141 @@ class Validate:
 	def __validate_downloads(self):
 		if self.__args.downloads:
 			self.__validate_directory(self.__args.downloads)
+		elif self.__args.download_hash:
+			self.__error("Downloads directory is required for storing the downloaded files by hash")
 
 	def __validate_screenshots(self):
 		if self.__args.screenshots:
 			self.__validate_directory(self.__args.screenshots)
-			if self.__success and not self.__args.playwright:
+			if self.__success and not self.__args.playwright and not self.__args.playwright_hybrid:
 				self.__error(f"Playwright's headless browser is required for taking schreenshots")
 
+	def __validate_screenshot_viewport(self):
+		tmp = {"width": 1280, "height": 720}
+		if self.__args.screenshot_viewport:
+			width, _, height = self.__args.screenshot_viewport.lower().partition("x")
+			if not width.strip().isdigit() or not height.strip().isdigit():
+				self.__error("Screenshot viewport must be in the 'width x height' format, e.g. '1280x720'")
+			elif int(width) <= 0 or int(height) <= 0:
+				self.__error("Screenshot viewport width and height must be greater than zero")
+			elif not self.__args.screenshots:
+				self.__error("Screenshots directory is required for setting the screenshot viewport")
+			else:
+				tmp = {"width": int(width), "height": int(height)}
+		self.__args.screenshot_viewport = tmp
+
+	def __validate_screenshot_format(self):
+		tmp = "png"
+		if self.__args.screenshot_format:
+			tmp = self.__args.screenshot_format.lower()
+			if tmp not in screenshot.FORMATS:
+				self.__error("Supported screenshot formats are 'png', 'jpeg', and 'webp'")
+			elif not self.__args.screenshots:
+				self.__error("Screenshots directory is required for setting the screenshot format")
+		self.__args.screenshot_format = tmp
+
+	def __validate_screenshot_quality(self):
+		tmp = 80
+		if self.__args.screenshot_quality:
+			if not self.__args.screenshot_quality.isdigit():
+				self.__error("Screenshot quality must be numeric")
+			else:
+				tmp = int(self.__args.screenshot_quality)
+				if tmp < 1 or tmp > 100:
+					self.__error("Screenshot quality must be between 1 and 100")
+				elif self.__args.screenshot_format not in ["jpeg", "webp"]:
+					self.__error("Screenshot quality is supported only with the JPEG and WebP screenshot formats")
+		self.__args.screenshot_quality = tmp
+
+	def __validate_screenshot_thumbnail(self):
+		tmp = 0
+		if self.__args.screenshot_thumbnail:
+			if not self.__args.screenshot_thumbnail.isdigit():
+				self.__error("Screenshot thumbnail width must be numeric")
+			else:
+				tmp = int(self.__args.screenshot_thumbnail)
+				if tmp <= 0:
+					self.__error("Screenshot thumbnail width must be greater than zero")
+				elif not self.__args.screenshots:
+					self.__error("Screenshots directory is required for generating screenshot thumbnails")
+		self.__args.screenshot_thumbnail = tmp
+		if self.__success and screenshot.needs_pillow(self.__args.screenshot_format, tmp) and not screenshot.has_pillow():
+			self.__error("Pillow is required for the WebP screenshot format and for screenshot thumbnails, install it with 'pip3 install pillow'")
+
+	def __validate_screenshot_workers(self):
+		tmp = 4
+		if self.__args.screenshot_workers:
+			if not self.__args.screenshot_workers.isdigit():
+				self.__error("Number of screenshot workers must be numeric")
+			else:
+				tmp = int(self.__args.screenshot_workers)
+				if tmp <= 0:
+					self.__error("Number of screenshot workers must be greater than zero")
+				elif not self.__args.screenshots:
+					self.__error("Screenshots directory is required for setting the number of screenshot workers")
+		self.__args.screenshot_workers = tmp
+
+	def __validate_stream_out(self):
+		if self.__args.stream_out and directory.is_directory(self.__args.stream_out):
+			self.__error(f"\"{self.__args.stream_out}\" is a directory")
+
+	def __validate_no_compact(self):
+		if self.__args.no_compact and not self.__args.stream_out and not self.__args.job:
+			self.__error("Streaming the results is required for not compacting them")
+
+	def __validate_bloom_filter(self):
+		tmp = 0
+		if self.__args.bloom_filter:
+			tmp = general.to_float(self.__args.bloom_filter)
+			if tmp is None:
+				self.__error("Bloom filter false-positive rate must be numeric")
+			elif tmp <= 0 or tmp >= 1:
+				self.__error("Bloom filter false-positive rate must be greater than zero and less than one")
+		self.__args.bloom_filter = tmp
+
+	def __validate_job(self):
+		if self.__args.job:
+			self.__validate_directory(self.__args.job)
+
+	def __validate_cache(self):
+		if self.__args.cache:
+			self.__validate_directory(self.__args.cache)
+			if self.__success and self.__args.playwright:
+				self.__error("Cache is not supported with Playwright's headless browser, use the hybrid mode instead")
+
+	def __validate_frontier(self):
+		if self.__args.frontier:
+			success, message = frontier.validate(self.__args.frontier)
+			if not success:
+				self.__error(message)
+			elif self.__args.shards > 1:
+				self.__error("Frontier is not supported with multiple shards")
+
+	def __validate_metrics(self):
+		if self.__args.metrics and directory.is_directory(self.__args.metrics):
+			self.__error(f"\"{self.__args.metrics}\" is a directory")
+
+	def __validate_metrics_interval(self):
+		tmp = 10
+		if self.__args.metrics_interval:
+			tmp = general.to_float(self.__args.metrics_interval)
+			if tmp is None:
+				self.__error("Metrics interval must be numeric")
+			elif tmp <= 0:
+				self.__error("Metrics interval must be greater than zero")
+		self.__args.metrics_interval = tmp
+
+	def __validate_metrics_port(self):
+		tmp = 0
+		if self.__args.metrics_port:
+			if not self.__args.metrics_port.isdigit():
+				self.__error("Metrics port number must be numeric")
+			else:
+				tmp = int(self.__args.metrics_port)
+				if tmp < 1 or tmp > 65535:
+					self.__error("Metrics port number is out of range")
+		self.__args.metrics_port = tmp
+
 	def __validate_directory(self, dir):
 		if not directory.is_directory(dir):
 			self.__error(f"\"{dir}\" does not exist or is not a directory")